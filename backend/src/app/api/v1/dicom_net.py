@@ -1,14 +1,17 @@
+import asyncio
 import fastapi
 from fastapi import UploadFile, File
-from fastapi import Request, Response, status, Depends, HTTPException, File, UploadFile
+from fastapi import Query, Request, Response, status, Depends, HTTPException, File, UploadFile
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from app.services.dicom_network_interface import DicomNetworkInterface
 from app.core.container import Container
 from dependency_injector.wiring import Provide
 from app.core.middleware import inject
-from app.services.dicom_meta_data_handler import DicomMetadataHandler
-from io import BytesIO
-import pydicom
-from typing import Optional
+import orjson
+from typing import List, Literal, Optional
+from app.core.logger import logging
+
+logger = logging.getLogger(__name__)
 router = fastapi.APIRouter(tags=["dicom_net"], prefix="/dicom_net")
 
 @router.post("/upload_file")
@@ -18,32 +21,35 @@ async def upload_file(
     dicom_network_interface: DicomNetworkInterface = Depends(Provide[Container.dicom_network_interface])
 ):
     dicom_data = await dicom_file.read()
-    dicom_io = BytesIO(dicom_data)
     try:
-        dicom = pydicom.dcmread(dicom_io)
-        dicomHandle = DicomMetadataHandler(dicom)
-        extractor = dicomHandle.extract_full_metadata()
-        processed_metadata = dicomHandle.extract_dicom_metadata(extractor)
-        print("processed_metadata", processed_metadata)
-        return await dicom_network_interface.upload_file_dataset(dicomHandle.dicom)
+        # Only the header is parsed, the file is sent as uploaded
+        return await asyncio.to_thread(dicom_network_interface.upload_file, dicom_data, dicom_file.filename)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/find_studie")
+@router.post("/upload_files")
 @inject
-async def find_studies(
-    PatientID: Optional[str] = None,
-    StudyInstanceUID: Optional[str] = None,
-    AccessionNumber: Optional[str] = None,
-    ModalitiesInStudy: Optional[str] = None,
-    PatientName: Optional[str] = None,
+async def upload_files(
+    dicom_files: List[UploadFile] = File(...),
     dicom_network_interface: DicomNetworkInterface = Depends(Provide[Container.dicom_network_interface])
 ):
     """
-    Find all studies for a specific patient.
-    This endpoint performs a DICOM C-FIND operation at the STUDY level.
+    Upload several DICOM files with C-STORE over a single association.
+    
+    Returns one result per uploaded file, in the order they were sent.
     """
-    query_params = {
+    files = [await dicom_file.read() for dicom_file in dicom_files]
+    return await asyncio.to_thread(dicom_network_interface.upload_files, files)
+
+def _study_query(
+    PatientID: Optional[str],
+    StudyInstanceUID: Optional[str],
+    AccessionNumber: Optional[str],
+    ModalitiesInStudy: Optional[str],
+    PatientName: Optional[str],
+) -> dict:
+    """Build the C-FIND identifier, returning keys left empty by the caller."""
+    return {
         "PatientID": PatientID or "",
         "StudyInstanceUID": StudyInstanceUID or "",
         "StudyDate": "",
@@ -55,13 +61,73 @@ async def find_studies(
         "PatientName": PatientName or "",
         "PixelData": ""
     }
+
+def _orjson_default(obj):
+    """Serialize what orjson does not handle natively (pydicom's DSfloat and the like)."""
+    if isinstance(obj, float):
+        return float(obj)
+    return str(obj)
+
+def _orjson_response(result) -> Response:
+    """Serialize a DicomResult with orjson, bypassing FastAPI's jsonable_encoder.
+
+    orjson encodes the dataclass itself, straight to bytes, so large study and
+    series payloads are not walked in Python first.
+    """
+    return Response(
+        content=orjson.dumps(result, default=_orjson_default),
+        media_type="application/json",
+    )
+
+@router.get("/find_studie")
+@inject
+async def find_studies(
+    PatientID: Optional[str] = None,
+    StudyInstanceUID: Optional[str] = None,
+    AccessionNumber: Optional[str] = None,
+    ModalitiesInStudy: Optional[str] = None,
+    PatientName: Optional[str] = None,
+    dicom_network_interface: DicomNetworkInterface = Depends(Provide[Container.dicom_network_interface])
+):
+    """
+    Find all studies for a specific patient.
+    This endpoint performs a DICOM C-FIND operation at the STUDY level.
+    """
+    query_params = _study_query(PatientID, StudyInstanceUID, AccessionNumber, ModalitiesInStudy, PatientName)
     
     return await dicom_network_interface.find_studies(query_params)
 
-@router.get("/get_study")
+@router.get("/find_studie_stream")
+@inject
+async def find_studies_stream(
+    PatientID: Optional[str] = None,
+    StudyInstanceUID: Optional[str] = None,
+    AccessionNumber: Optional[str] = None,
+    ModalitiesInStudy: Optional[str] = None,
+    PatientName: Optional[str] = None,
+    dicom_network_interface: DicomNetworkInterface = Depends(Provide[Container.dicom_network_interface])
+):
+    """
+    Find studies like /find_studie, streaming them as newline-delimited JSON.
+    
+    Each study is written as soon as the PACS returns it, so large result sets
+    are never held in memory and the first study arrives without waiting for
+    the last.
+    """
+    query_params = _study_query(PatientID, StudyInstanceUID, AccessionNumber, ModalitiesInStudy, PatientName)
+    
+    async def ndjson():
+        async for study in dicom_network_interface.find_studies_stream(query_params):
+            yield orjson.dumps(study, default=_orjson_default) + b"\n"
+    
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+@router.get("/get_study", response_class=ORJSONResponse)
 @inject
 async def get_study(
     StudyInstanceUID: str,
+    include_details: bool = False,
+    detail_level: Literal["summary", "series", "full"] = "full",
     dicom_network_interface: DicomNetworkInterface = Depends(Provide[Container.dicom_network_interface])
 ):
     """
@@ -73,11 +139,37 @@ async def get_study(
     
     Args:
         StudyInstanceUID: The Study Instance UID to retrieve
+        include_details: Repeat the patient/study attributes (already returned by
+            find_studie) in every instance
+        detail_level: "summary" for counts only, "series" for the series list
+            without per-instance metadata, "full" for everything
         
     Returns:
         A DicomResult containing all retrieved instances with their metadata
     """
-    return await dicom_network_interface.get_study_with_pixels(StudyInstanceUID)
+    return _orjson_response(
+        await dicom_network_interface.get_study_with_pixels(StudyInstanceUID, include_details, detail_level)
+    )
+
+
+@router.get("/get_study_move", response_class=ORJSONResponse)
+@inject
+async def get_study_move(
+    StudyInstanceUID: str,
+    include_details: bool = False,
+    detail_level: Literal["summary", "series", "full"] = "full",
+    dicom_network_interface: DicomNetworkInterface = Depends(Provide[Container.dicom_network_interface])
+):
+    """
+    Retrieve a complete study like /get_study, using C-MOVE instead of C-GET.
+    
+    The PACS pushes the instances to the backend's storage SCP over parallel
+    associations, which is faster for large studies. The PACS must have the
+    backend's AE title configured as a move destination.
+    """
+    return _orjson_response(
+        await dicom_network_interface.get_study_with_pixels_via_move(StudyInstanceUID, include_details, detail_level)
+    )
 
 
 @router.get("/get_instance")
@@ -107,3 +199,87 @@ async def get_instance(
         SeriesInstanceUID, 
         SOPInstanceUID
     )
+
+
+@router.get("/get_instances")
+@inject
+async def get_instances(
+    StudyInstanceUID: str,
+    SeriesInstanceUID: str,
+    SOPInstanceUID: Optional[List[str]] = Query(None),
+    dicom_network_interface: DicomNetworkInterface = Depends(Provide[Container.dicom_network_interface])
+):
+    """
+    Retrieve several instances of one series.
+    
+    A single SERIES level C-GET is sent and only the requested instances are
+    kept, instead of one association and C-GET per instance.
+    
+    Args:
+        StudyInstanceUID: The Study Instance UID
+        SeriesInstanceUID: The Series Instance UID
+        SOPInstanceUID: The SOP Instance UIDs to return (repeatable), the whole series if omitted
+        
+    Returns:
+        A DicomResult containing the metadata of each instance, keyed by SOP Instance UID
+    """
+    return _orjson_response(await dicom_network_interface.get_instances_with_pixels(
+        StudyInstanceUID, 
+        SeriesInstanceUID, 
+        SOPInstanceUID
+    ))
+
+
+@router.get("/get_instance_metadata")
+@inject
+async def get_instance_metadata(
+    StudyInstanceUID: str,
+    SeriesInstanceUID: str,
+    SOPInstanceUID: str,
+    dicom_network_interface: DicomNetworkInterface = Depends(Provide[Container.dicom_network_interface])
+):
+    """
+    Retrieve the metadata of a specific DICOM instance.
+    
+    Like /get_instance, but the retrieved file is only parsed up to its pixel
+    data, so large images and multi-frame instances are not read into memory.
+    
+    Args:
+        StudyInstanceUID: The Study Instance UID
+        SeriesInstanceUID: The Series Instance UID
+        SOPInstanceUID: The SOP Instance UID
+        
+    Returns:
+        A DicomResult containing the instance metadata
+    """
+    return await dicom_network_interface.get_instance_metadata(
+        StudyInstanceUID, 
+        SeriesInstanceUID, 
+        SOPInstanceUID
+    )
+
+
+@router.get("/get_instance_file")
+@inject
+async def get_instance_file(
+    StudyInstanceUID: str,
+    SeriesInstanceUID: str,
+    SOPInstanceUID: str,
+    dicom_network_interface: DicomNetworkInterface = Depends(Provide[Container.dicom_network_interface])
+):
+    """
+    Retrieve a specific DICOM instance, pixel data included, as an application/dicom file.
+    
+    Args:
+        StudyInstanceUID: The Study Instance UID
+        SeriesInstanceUID: The Series Instance UID
+        SOPInstanceUID: The SOP Instance UID
+    """
+    result = await dicom_network_interface.get_instance_pixels(
+        StudyInstanceUID, 
+        SeriesInstanceUID, 
+        SOPInstanceUID
+    )
+    if not result.success:
+        raise HTTPException(status_code=result.status_code, detail=result.message)
+    return Response(content=result.data, media_type="application/dicom")
@@ -22,7 +22,8 @@ class Container(containers.DeclarativeContainer):
     cloudinary = providers.Factory(CloudinaryService)
     auth_service = providers.Factory(AuthServiceImp, user_repository=user_repository)
     user_service = providers.Factory(UserServiceImp, user_repository=user_repository, cloudinary_service=cloudinary)
-    dicom_network_interface = providers.Factory(
+    # Singleton so the service can keep its DICOM association between requests
+    dicom_network_interface = providers.Singleton(
         DicomNetworkInterfaceImp,
         user_repository=user_repository, 
         server_ip="arc",  # This should match your PACS service name in docker-compose
@@ -32,5 +33,6 @@ class Container(containers.DeclarativeContainer):
         # server_ae_title="ORTHANC",
         # server_port=4242,
         local_ae_title="PYNETDICOM",
-        timeout=60  # Increased timeout for larger queries
+        timeout=60,  # Increased timeout for larger queries
+        storage_scp_port=11113,  # C-MOVE destination, must match the PACS' entry for PYNETDICOM
     )
\ No newline at end of file
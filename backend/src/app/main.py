@@ -28,4 +28,5 @@ async def startup():
 @app.on_event("shutdown")
 async def shutdown():
     await container.db().disconnect()
+    container.dicom_network_interface().close()
     container.unwire()
\ No newline at end of file
@@ -1,9 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any
+from typing import AsyncIterator, Dict, List, Any, Literal, Optional, Union
 from pydicom.dataset import Dataset
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(slots=True)
 class DicomResult:
     success: bool
     message: str
@@ -31,6 +31,11 @@ class DicomNetworkInterface(ABC):
     async def upload_file_dataset(self, dataset: Dataset) -> DicomResult:
         """Upload a single DICOM file using C-STORE."""
         pass
+
+    @abstractmethod
+    def upload_files(self, files: List[Union[bytes, Dataset]]) -> List[DicomResult]:
+        """Upload several DICOM files using C-STORE over a single association."""
+        pass
     
     @abstractmethod
     async def find_studies(self, query_params: Dict) -> Any:
@@ -45,6 +50,19 @@ class DicomNetworkInterface(ABC):
         """
         pass
     
+    @abstractmethod
+    def find_studies_stream(self, query_params: Dict) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Perform a C-FIND operation, yielding each matching study as it arrives.
+        
+        Args:
+            query_params: Dictionary of DICOM attributes to query for
+            
+        Returns:
+            Async iterator over the query results
+        """
+        pass
+    
     @abstractmethod
     def get_study(self, study_instance_uid: str) -> DicomResult:
         """Retrieve all DICOM data for a study using C-GET."""
@@ -56,12 +74,41 @@ class DicomNetworkInterface(ABC):
         pass
     
     @abstractmethod
-    async def get_study_with_pixels(self, study_instance_uid: str) -> DicomResult:
+    async def get_study_with_pixels(
+        self,
+        study_instance_uid: str,
+        include_details: bool = False,
+        detail_level: Literal["summary", "series", "full"] = "full",
+    ) -> DicomResult:
         """
         Retrieve complete DICOM data for a study including pixel data using C-GET.
         
         Args:
             study_instance_uid: The Study Instance UID to retrieve
+            include_details: Repeat the patient/study level attributes in every instance
+            detail_level: "summary" (counts only), "series" (series level fields)
+                or "full" (every element of every instance)
+            
+        Returns:
+            DicomResult containing the retrieved DICOM data
+        """
+        pass
+
+    @abstractmethod
+    async def get_study_with_pixels_via_move(
+        self,
+        study_instance_uid: str,
+        include_details: bool = False,
+        detail_level: Literal["summary", "series", "full"] = "full",
+    ) -> DicomResult:
+        """
+        Retrieve a study like get_study_with_pixels, using C-MOVE to a local storage SCP.
+        
+        Args:
+            study_instance_uid: The Study Instance UID to retrieve
+            include_details: Repeat the patient/study level attributes in every instance
+            detail_level: "summary" (counts only), "series" (series level fields)
+                or "full" (every element of every instance)
             
         Returns:
             DicomResult containing the retrieved DICOM data
@@ -83,4 +130,52 @@ class DicomNetworkInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    async def get_instance_metadata(self, study_instance_uid: str, series_instance_uid: str, sop_instance_uid: str) -> DicomResult:
+        """
+        Retrieve the metadata of a specific DICOM instance, without reading its pixel data.
+        
+        Args:
+            study_instance_uid: The Study Instance UID
+            series_instance_uid: The Series Instance UID
+            sop_instance_uid: The SOP Instance UID
+            
+        Returns:
+            DicomResult containing the instance metadata
+        """
+        pass
+
+    @abstractmethod
+    async def get_instance_pixels(self, study_instance_uid: str, series_instance_uid: str, sop_instance_uid: str) -> DicomResult:
+        """
+        Retrieve a specific DICOM instance as an encoded Part 10 file.
+        
+        Args:
+            study_instance_uid: The Study Instance UID
+            series_instance_uid: The Series Instance UID
+            sop_instance_uid: The SOP Instance UID
+            
+        Returns:
+            DicomResult whose data is the file content, pixel data included
+        """
+        pass
 
+    @abstractmethod
+    async def get_instances_with_pixels(
+        self,
+        study_instance_uid: str,
+        series_instance_uid: str,
+        sop_instance_uids: Optional[List[str]] = None,
+    ) -> DicomResult:
+        """
+        Retrieve several instances of one series with a single C-GET.
+        
+        Args:
+            study_instance_uid: The Study Instance UID
+            series_instance_uid: The Series Instance UID
+            sop_instance_uids: The SOP Instance UIDs to return, the whole series if omitted
+            
+        Returns:
+            DicomResult containing the metadata of each instance, keyed by SOP Instance UID
+        """
+        pass
@@ -1,11 +1,31 @@
 from app.services.base_service import BaseService
-from app.services.dicom_network_interface import DicomNetworkInterface
+from app.services.dicom_network_interface import DicomNetworkInterface, DicomResult
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import  Optional, Dict, Any, List
+from functools import lru_cache, partial
+from operator import itemgetter
+import asyncio
+import itertools
+from typing import  Optional, Dict, Any, AsyncIterator, Callable, Iterable, Iterator, List, Literal, Tuple, Union
 from io import BytesIO
+import multiprocessing
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
 from pydicom import dcmread
+from pydicom.datadict import dictionary_VR, tag_for_keyword
 from pydicom.dataset import Dataset
-from pynetdicom import AE, evt, QueryRetrievePresentationContexts, StoragePresentationContexts, build_role
+from pydicom.filereader import read_dataset
+from pydicom.filewriter import write_file_meta_info
+from pydicom.multival import MultiValue
+from pynetdicom import AE, ALL_TRANSFER_SYNTAXES, evt, QueryRetrievePresentationContexts, StoragePresentationContexts, build_role
+from pynetdicom.association import Association
+from pynetdicom.presentation import DEFAULT_TRANSFER_SYNTAXES
 from pynetdicom.sop_class import (
     PatientRootQueryRetrieveInformationModelFind,
     PatientRootQueryRetrieveInformationModelGet,
@@ -21,54 +41,383 @@ from app.core.logger import logging
 from app.core.config import ExternalSettings
 from app.repository.user_repository import UserRepository
 from app.services.service_utils.dicom_meta_data_handler import DicomMetadataHandler
+from app.services.service_utils.dicom_summary import DEFER_SIZE, element_value, summarize_file
 settings = ExternalSettings()
 logger = logging.getLogger(__name__)
 
-@dataclass
-class DicomResult:
-    success: bool
-    message: str
-    status_code: int
-    data: Any = None
+DetailLevel = Literal["summary", "series", "full"]
+# (abstract syntax, transfer syntaxes) of a requested presentation context
+PresentationContextKey = Tuple[str, Tuple[str, ...]]
+
+# A cached association idle for longer than this is released and renegotiated
+# rather than reused, peers drop idle associations on their own timeouts
+_ASSOC_IDLE_SECONDS = 30
+
+# pynetdicom refuses more requested presentation contexts than this
+_MAX_REQUESTED_CONTEXTS = 128
+
+_FIND_CONTEXTS = (
+    (PatientRootQueryRetrieveInformationModelFind, tuple(DEFAULT_TRANSFER_SYNTAXES)),
+    (StudyRootQueryRetrieveInformationModelFind, tuple(DEFAULT_TRANSFER_SYNTAXES)),
+)
+
+_BASIC_TRANSFER_SYNTAXES = (
+    "1.2.840.10008.1.2",       # Implicit VR Little Endian
+    "1.2.840.10008.1.2.1",     # Explicit VR Little Endian
+)
+_JPEG_TRANSFER_SYNTAXES = (
+    "1.2.840.10008.1.2.4.50",  # JPEG Baseline
+    "1.2.840.10008.1.2.4.51",  # JPEG Extended
+    "1.2.840.10008.1.2.4.57",  # JPEG Lossless
+)
+_DEFAULT_TRANSFER_SYNTAXES = (*_JPEG_TRANSFER_SYNTAXES, *_BASIC_TRANSFER_SYNTAXES)
+
+# (tag, keyword, default) of the series level fields taken from the first instance
+_SERIES_TAGS = (
+    (0x0008103E, 'SeriesDescription', ''),
+    (0x00080060, 'Modality', ''),
+)
+# Storage SOP classes requested for the instances a C-GET sends back, with the
+# role selection items that make us the SCP for them
+_STORAGE_CONTEXTS = (
+    CTImageStorage,
+    MRImageStorage,
+    UltrasoundImageStorage,
+    UltrasoundMultiFrameImageStorage,
+)
+# SOP classes of a study, as discovered by C-FIND, are kept this long
+_SOP_CLASSES_TTL_SECONDS = 300
+_SOP_CLASSES_CACHE_SIZE = 256
+# Disk budget of the retrieved instance cache
+_INSTANCE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+_SERIES_NUMBER_MISSING = 9999
+_MODALITIES_IN_STUDY_TAG = 0x00080061
+_SOP_CLASSES_IN_STUDY_TAG = 0x00080062
+# Per-instance lookups go by numeric tag, skipping pydicom's keyword translation
+_SERIES_INSTANCE_UID_TAG = 0x0020000E
+_SERIES_NUMBER_TAG = 0x00200011
+_ROWS_TAG = 0x00280010
+_COLUMNS_TAG = 0x00280011
+_PIXEL_SPACING_TAG = 0x00280030
+_PROGRESS_LOG_INTERVAL = 50
+_RECEIVE_QUEUE_SIZE = 16
+_PENDING_STATUSES = frozenset({0xFF00, 0xFF01})
+_ISSUE_CATEGORIES = frozenset({'Cancel', 'Failure', 'Warning'})
+_STATUS_ATTRS = (
+    'NumberOfRemainingSuboperations',
+    'NumberOfCompletedSuboperations',
+    'NumberOfFailedSuboperations',
+    'NumberOfWarningSuboperations',
+)
+_SENTINEL = object()
+
+@lru_cache(maxsize=64)
+def _transfer_syntaxes_for(current_ts: Optional[str]) -> Tuple[str, ...]:
+    """Transfer syntaxes to propose for a dataset encoded in current_ts, that one first."""
+    if not current_ts:
+        return _DEFAULT_TRANSFER_SYNTAXES
+    return tuple(dict.fromkeys((current_ts, *_DEFAULT_TRANSFER_SYNTAXES)))
+
+@lru_cache(maxsize=128)
+def _keyword_tag_vr(keyword: str) -> Optional[Tuple[int, str]]:
+    """Resolve a keyword to its (tag, VR) once, None if it is not a dictionary keyword."""
+    tag = tag_for_keyword(keyword)
+    if tag is None:
+        return None
+    return tag, dictionary_VR(tag)
+
+def _tag_value(dataset: Dataset, tag: int) -> Any:
+    """Return the value of the element at tag, or None if it is absent."""
+    # Dataset.get returns the element, not its value, for a tag key
+    elem = dataset.get(tag)
+    return None if elem is None else elem.value
+
+# Only a handful of distinct status codes are ever seen
+_status_category = lru_cache(maxsize=64)(code_to_category)
+
+@lru_cache(maxsize=128)
+def _storage_role(storage_class: str) -> Any:
+    """SCP/SCU role selection item letting the peer send storage_class on a C-GET association."""
+    return build_role(storage_class, scp_role=True)
+
+@lru_cache(maxsize=32)
+def _storage_roles(storage_classes: Tuple[str, ...]) -> Tuple[Any, ...]:
+    """Role selection items for a negotiated set of storage classes, built once per set."""
+    return tuple(_storage_role(storage_class) for storage_class in storage_classes)
+
+@dataclass(slots=True)
+class _GetAssociation:
+    """A pooled C-GET association and the retrieval currently using it."""
+    assoc: Optional[Association] = None
+    storage_classes: Tuple[str, ...] = ()
+    last_used: float = 0.0
+    store_handler: Optional[Callable[[evt.Event], int]] = None
+
+def _end_association(assoc: Optional[Association], error: Optional[Exception]) -> None:
+    """End an association after error interrupted an operation on it.
+
+    A ValueError is raised locally, by a dataset or identifier that could not be
+    encoded or decoded, while the peer is fine, so the association is released
+    gracefully. Anything else (a network or state error, or no error at all)
+    aborts it.
+    """
+    if assoc is None or not assoc.is_established:
+        return
+    if isinstance(error, ValueError):
+        assoc.release()
+    else:
+        assoc.abort()
+
+def _tag_values(dataset: Dataset, tags: Tuple[Tuple[int, str, Any], ...]) -> Dict[str, Any]:
+    """Look up (tag, keyword, default) fields by tag, skipping the keyword to tag translation."""
+    values = {}
+    for tag, keyword, default in tags:
+        # Dataset.get returns the element, not its value, for a tag key
+        elem = dataset.get(tag)
+        values[keyword] = default if elem is None or elem.value is None else elem.value
+    return values
+
+def _series_number(dataset: Dataset) -> Optional[int]:
+    """Return SeriesNumber as a plain int (not a pydicom IS), or None if absent/invalid."""
+    value = _tag_value(dataset, _SERIES_NUMBER_TAG)
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+@lru_cache(maxsize=256)
+def _split_modalities(raw: str) -> Tuple[str, ...]:
+    """Split a backslash-separated multi-valued CS string into its codes."""
+    return tuple(code for code in raw.split('\\') if code)
+
+def _parse_modalities(raw: Any) -> List[str]:
+    """Normalize a ModalitiesInStudy value to a list of modality codes."""
+    match raw:
+        case None:
+            return []
+        case str():
+            return list(_split_modalities(raw))
+        case MultiValue() | list() | tuple():
+            return [str(code) for code in raw if code]
+    return [str(raw)]
+
+def _pixel_spacing(dataset: Dataset) -> Optional[List[float]]:
+    """Return PixelSpacing as a list of floats, or None if absent/invalid."""
+    value = _tag_value(dataset, _PIXEL_SPACING_TAG)
+    if value is None:
+        return None
+    try:
+        return [float(x) for x in value]
+    except (TypeError, ValueError):
+        return None
+
+def _suboperation_counts(status: Dataset, previous: Tuple[int, int, int, int]) -> Tuple[int, int, int, int]:
+    """Read the C-GET sub-operation counters in one pass, keeping the previous value of any that are absent."""
+    return tuple(getattr(status, attr, default) for attr, default in zip(_STATUS_ATTRS, previous))
+
+def _identifier_dict(identifier: Dataset) -> Dict[str, Any]:
+    """Convert a C-FIND identifier into a keyword -> value dict in a single pass.
+
+    An element that fails to convert is reported in place, the rest of the
+    match is kept.
+    """
+    result = {}
+    for elem in identifier:
+        keyword = elem.keyword
+        if not keyword:
+            continue
+        try:
+            if elem.tag == _MODALITIES_IN_STUDY_TAG:
+                result[keyword] = _parse_modalities(elem.value)
+            else:
+                result[keyword] = element_value(elem)
+        except Exception as e:
+            logger.warning("Error processing element %s: %s", keyword, e)
+            result[keyword] = f"Error: {e}"
+    return result
+
+def _completed_summaries(futures: List[Future]) -> List[Dict[str, Any]]:
+    """Wait for the instance summaries of one series, skipping any that failed."""
+    instances = []
+    for future in futures:
+        try:
+            instances.append(future.result())
+        except Exception as e:
+            logger.warning("Error summarizing dataset: %s", e)
+    return instances
+
+def _series_list(series_data: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Convert the per-series accumulator into the response list, sorted by SeriesNumber."""
+    # Each entry is paired with its sort key, computed once from the int
+    # SeriesNumber; series without one go last
+    keyed = [
+        (
+            _SERIES_NUMBER_MISSING if series_info['SeriesNumber'] is None else series_info['SeriesNumber'],
+            {
+                "SeriesInstanceUID": series_uid,
+                "SeriesDescription": series_info['SeriesDescription'],
+                "Modality": series_info['Modality'],
+                "SeriesNumber": series_info['SeriesNumber'],
+                "Rows": series_info['Rows'],
+                "Columns": series_info['Columns'],
+                "PixelSpacing": series_info['PixelSpacing'],
+                "InstanceCount": series_info['InstanceCount'],
+                "instances": series_info['instances']
+            },
+        )
+        for series_uid, series_info in series_data.items()
+    ]
+    
+    # Sort series by SeriesNumber if available; itemgetter keeps the key
+    # extraction in C and the sort is stable for equal numbers
+    keyed.sort(key=itemgetter(0))
+    return [entry for _, entry in keyed]
+
+def _consume_retrieve_responses(responses: Iterable[Tuple[Dataset, Optional[Dataset]]], operation: str) -> Tuple[bool, int, int]:
+    """Consume the responses of a C-GET or C-MOVE.
+
+    Returns:
+        (completed, failed sub-operations, warning sub-operations)
+    """
+    completed = False
+    total_instances = 0
+    remaining = 0
+    failed = 0
+    warning = 0
+    
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+    for status, _ in responses:
+        if not status:
+            logger.error("Connection timed out, was aborted or received invalid response")
+            break
+        
+        status_code = status.Status
+        # One pending response arrives per sub-operation, so keep this
+        # branch free of status category lookups
+        if status_code in _PENDING_STATUSES:
+            remaining, total_instances, failed, warning = _suboperation_counts(
+                status, (remaining, total_instances, failed, warning)
+            )
+            
+            # Only report progress every _PROGRESS_LOG_INTERVAL instances
+            if debug_enabled:
+                logger.debug("%s pending: completed=%d remaining=%d failed=%d warning=%d",
+                             operation, total_instances, remaining, failed, warning)
+            elif total_instances and total_instances % _PROGRESS_LOG_INTERVAL == 0:
+                logger.info("%s pending: completed=%d remaining=%d", operation, total_instances, remaining)
+            continue
+        
+        # The first non-Pending status is the final response
+        if status_code == 0x0000:  # Success
+            completed = True
+            total_instances = getattr(status, 'NumberOfCompletedSuboperations', total_instances)
+            logger.info("%s completed successfully, received %d instances", operation, total_instances)
+        else:
+            failed = getattr(status, 'NumberOfFailedSuboperations', failed)
+            warning = getattr(status, 'NumberOfWarningSuboperations', warning)
+            logger.warning("%s issue: %s - Status: 0x%04X", operation, _status_category(status_code), status_code)
+        break
+    
+    return completed, failed, warning
+
+def _read_header(event: evt.Event, last_tag: int) -> Dataset:
+    """Parse a received C-STORE dataset only up to last_tag, straight from its raw encoding.
+
+    event.dataset would decode every element, Pixel Data included.
+    """
+    transfer_syntax = event.context.transfer_syntax
+    if transfer_syntax.is_deflated:
+        return event.dataset
+    buffer = event.request.DataSet
+    buffer.seek(0)
+    try:
+        return read_dataset(
+            buffer,
+            transfer_syntax.is_implicit_VR,
+            transfer_syntax.is_little_endian,
+            stop_when=lambda tag, vr, length: tag > last_tag,
+        )
+    finally:
+        buffer.seek(0)
+
+def _spool_dataset(event: evt.Event, path: str) -> None:
+    """Write the dataset of a C-STORE request to path as received, without decoding it."""
+    with open(path, 'wb') as f:
+        f.write(b'\x00' * 128)
+        f.write(b'DICM')
+        write_file_meta_info(f, event.file_meta)
+        f.write(event.request.DataSet.getvalue())
 
 class DicomNetworkInterfaceImp(BaseService, DicomNetworkInterface):
-    def __init__(self,user_repository: UserRepository, server_ip: str, server_port: int, server_ae_title: str, local_ae_title: str,timeout: int = 30):
+    def __init__(self,user_repository: UserRepository, server_ip: str, server_port: int, server_ae_title: str, local_ae_title: str,timeout: int = 30, max_associations: int = 4, storage_scp_port: int = 11113):
         self.timeout = timeout
+        self.storage_scp_port = storage_scp_port
+        self.max_associations = max_associations
         self.server_ip = server_ip
         self.server_port = server_port
         self.server_ae_title = server_ae_title
         self.local_ae_title = local_ae_title
         self.user_repository = user_repository
-    def get_transfer_syntaxes(self, dataset):
-        """Get appropriate transfer syntaxes based on the dataset."""
-        current_ts = getattr(dataset, 'file_meta', {}).get('TransferSyntaxUID', None)
-        logger.info(f"Current transfer syntax: {current_ts}")
-
-        basic_syntaxes = [
-            "1.2.840.10008.1.2",       # Implicit VR Little Endian
-            "1.2.840.10008.1.2.1",     # Explicit VR Little Endian
-        ]
-
-        jpeg_syntaxes = [
-            "1.2.840.10008.1.2.4.50",  # JPEG Baseline
-            "1.2.840.10008.1.2.4.51",  # JPEG Extended
-            "1.2.840.10008.1.2.4.57",  # JPEG Lossless
-        ]
-
-        transfer_syntaxes = []
-        if current_ts:
-            transfer_syntaxes.append(current_ts)
-        transfer_syntaxes.extend(jpeg_syntaxes)
-        transfer_syntaxes.extend(basic_syntaxes)
+        # Association reused across upload_file_dataset/find_studies calls, with
+        # the presentation contexts it was negotiated with
+        self._assoc: Optional[Association] = None
+        self._negotiated: Dict[PresentationContextKey, None] = {}
+        self._assoc_last_used = 0.0
+        self._assoc_lock = threading.Lock()
+        # Up to max_associations C-GET associations, each used by one retrieval
+        # at a time so retrievals can run in parallel. Idle ones are kept for
+        # reuse, most recently used last
+        self._get_slots = threading.BoundedSemaphore(max_associations)
+        self._get_idle: List[_GetAssociation] = []
+        self._get_pool_lock = threading.Lock()
+        # StudyInstanceUID -> (discovered at, SOP classes in the study)
+        self._study_sop_classes: Dict[str, Tuple[float, Tuple[str, ...]]] = {}
+        # Releases idle associations in the background until close()
+        self._closed = threading.Event()
+        self._reaper: Optional[threading.Thread] = None
+        # Created on first use, converting instances is CPU bound
+        self._summary_pool: Optional[ProcessPoolExecutor] = None
+        self._summary_pool_lock = threading.Lock()
+        # Retrieved instances kept on disk by SOPInstanceUID, least recently
+        # used first, as (path, size). Created on first use
+        self._instance_cache: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._instance_cache_bytes = 0
+        self._instance_cache_dir: Optional[str] = None
+        self._instance_cache_files = 0
+        self._instance_cache_lock = threading.Lock()
+        # Storage SCP receiving C-MOVE sub-operations, started on first use. Its
+        # C-STORE requests go to the retrieval whose C-MOVE message ID they carry
+        self._storage_scp: Optional[Any] = None
+        self._move_receivers: Dict[int, Callable[[evt.Event], int]] = {}
+        self._move_message_ids = itertools.count(1)
+        self._move_lock = threading.Lock()
+        # Blocking C-GET retrievals run here rather than in the default
+        # executor, so they cannot starve the finds and stores sharing it
+        self._retrieval_pool = ThreadPoolExecutor(
+            max_workers=max_associations, thread_name_prefix="dicom-retrieval"
+        )
 
-        return list(dict.fromkeys(transfer_syntaxes))
+    def get_transfer_syntaxes(self, dataset) -> Tuple[str, ...]:
+        """Get appropriate transfer syntaxes based on the dataset."""
+        try:
+            # UID is a str subclass, usable as is as the cache key
+            current_ts = dataset.file_meta.TransferSyntaxUID
+        except AttributeError:
+            current_ts = None
+        logger.debug("Current transfer syntax: %s", current_ts)
+        return _transfer_syntaxes_for(current_ts)
 
     def setup_ae(self, contexts=None):
         """Set up Application Entity with appropriate contexts."""
         ae = AE(ae_title=self.local_ae_title)
 
         if contexts:
-            for context in contexts:
+            # dict.fromkeys keeps the first occurrence of each context in order,
+            # so the presentation context IDs stay stable between calls
+            for context in dict.fromkeys(contexts):
                 ae.add_requested_context(context)
 
         # Set timeouts
@@ -76,233 +425,336 @@ class DicomNetworkInterfaceImp(BaseService, DicomNetworkInterface):
         ae.acse_timeout = self.timeout
         ae.network_timeout = self.timeout
 
+        # Accept PDUs of any size, so C-GET responses carrying pixel data are
+        # not split into the default 16 KB fragments
+        ae.maximum_pdu_size = 0
+
         return ae
 
     def upload_file(self, dicom_data: bytes, filename: str) -> DicomResult:
         """Upload a single DICOM file using C-STORE."""
         try:
-            dataset = dcmread(BytesIO(dicom_data))
+            # The header is enough to negotiate, the file itself is sent as is
+            header = dcmread(BytesIO(dicom_data), stop_before_pixels=True)
+        except Exception as e:
+            return DicomResult(
+                success=False,
+                message=f"Failed to process DICOM file: {str(e)}",
+                status_code=400
+            )
 
-            logger.info(f"Processing DICOM file: {filename}")
-            logger.info(f"SOPClassUID: {getattr(dataset, 'SOPClassUID', 'Unknown')}")
+        logger.info("Processing DICOM file: %s", filename)
+        logger.info("SOPClassUID: %s", getattr(header, 'SOPClassUID', 'Unknown'))
+        with tempfile.NamedTemporaryFile(suffix=".dcm") as f:
+            f.write(dicom_data)
+            f.flush()
+            return self._send_c_store(header, f.name)
 
-            ae = self.setup_ae()
-            transfer_syntaxes = self.get_transfer_syntaxes(dataset)
-            ae.add_requested_context(dataset.SOPClassUID, transfer_syntaxes)
-            print("**transfer_syntaxes***",transfer_syntaxes)
-            print("**dataset.SOPClassUID**",dataset.SOPClassUID)
+    def open_store_session(self, datasets: List[Dataset]) -> Optional[Association]:
+        """Open one association negotiating every (SOP Class, transfer syntaxes) pair in datasets."""
+        ae = self.setup_ae()
+        contexts = list(dict.fromkeys(
+            (dataset.SOPClassUID, self.get_transfer_syntaxes(dataset)) for dataset in datasets
+        ))
+        if len(contexts) > _MAX_REQUESTED_CONTEXTS:
+            logger.warning("%d presentation contexts needed, only the first %d are requested",
+                           len(contexts), _MAX_REQUESTED_CONTEXTS)
+            contexts = contexts[:_MAX_REQUESTED_CONTEXTS]
+        for sop_class_uid, transfer_syntaxes in contexts:
+            ae.add_requested_context(sop_class_uid, list(transfer_syntaxes))
 
-            def handle_store(event):
-                return 0x0000
+        return self._associate(ae)
 
-            assoc = ae.associate(
-                self.server_ip,
-                self.server_port,
-                ae_title=self.server_ae_title,
-                evt_handlers=[(evt.EVT_C_STORE, handle_store)]
-            )
+    def upload_files(self, files: List[Union[bytes, Dataset]]) -> List[DicomResult]:
+        """Upload several DICOM files using C-STORE over a single association.
 
-            if assoc.is_established:
-                try:
-                    status = assoc.send_c_store(dataset)
-                    status_code = getattr(status, "Status", None)
-
-                    if status and status_code == 0x0000:
-                        assoc.release()
-                        return DicomResult(
-                            success=True,
-                            message="DICOM file uploaded successfully",
-                            status_code=200
-                        )
-                    else:
-                        error_msg = f"Failed to store DICOM file. Status: {hex(status_code) if status_code else 'Unknown'}"
-                        assoc.abort()
-                        return DicomResult(success=False, message=error_msg, status_code=500)
+        Args:
+            files: Encoded DICOM files and/or already parsed datasets
 
-                except Exception as e:
-                    if assoc.is_established:
-                        assoc.abort()
-                    return DicomResult(success=False, message=f"Error during C-STORE: {str(e)}", status_code=500)
+        Returns:
+            One DicomResult per file, in the same order
+        """
+        results: List[Optional[DicomResult]] = [None] * len(files)
+        datasets: Dict[int, Dataset] = {}
+        for index, item in enumerate(files):
+            if isinstance(item, Dataset):
+                dataset = item
             else:
-                return DicomResult(
-                    success=False,
-                    message="Failed to establish association",
-                    status_code=500
+                try:
+                    dataset = dcmread(BytesIO(item), defer_size=DEFER_SIZE)
+                except Exception as e:
+                    results[index] = DicomResult(success=False, message=f"Failed to process DICOM file: {e}", status_code=400)
+                    continue
+            # The SOP Class selects the presentation context, a file without
+            # one cannot be sent but must not fail the rest of the batch
+            if dataset.get('SOPClassUID') is None:
+                results[index] = DicomResult(
+                    success=False, message="Failed to process DICOM file: no SOPClassUID", status_code=400
                 )
+                continue
+            datasets[index] = dataset
 
-        except Exception as e:
-            return DicomResult(
-                success=False,
-                message=f"Failed to process DICOM file: {str(e)}",
-                status_code=400
-            )
+        if datasets:
+            assoc = self.open_store_session(list(datasets.values()))
+            if assoc is None:
+                for index in datasets:
+                    results[index] = DicomResult(success=False, message="Failed to establish association", status_code=500)
+                return results
+
+            for index, dataset in datasets.items():
+                if not assoc.is_established:
+                    results[index] = DicomResult(success=False, message="Association was aborted", status_code=500)
+                    continue
+                try:
+                    status = assoc.send_c_store(dataset)
+                except (RuntimeError, ValueError) as e:
+                    results[index] = DicomResult(success=False, message=f"Error during C-STORE: {e}", status_code=500)
+                    continue
+                status_code = getattr(status, "Status", None)
+                if status and status_code == 0x0000:
+                    results[index] = DicomResult(success=True, message="DICOM file uploaded successfully", status_code=200)
+                else:
+                    error_msg = f"Failed to store DICOM file. Status: {hex(status_code) if status_code else 'Unknown'}"
+                    results[index] = DicomResult(success=False, message=error_msg, status_code=500)
+
+            if assoc.is_established:
+                assoc.release()
+
+        return results
 
     async def upload_file_dataset(self, dataset: Dataset) -> DicomResult:
         """Upload a single DICOM file using C-STORE."""
-        try:
-            ae = self.setup_ae()
-            transfer_syntaxes = self.get_transfer_syntaxes(dataset)
-            ae.add_requested_context(dataset.SOPClassUID, transfer_syntaxes)
+        return await asyncio.to_thread(self._send_c_store, dataset)
 
-            def handle_store(event):
-                return 0x0000
+    def _send_c_store(self, dataset: Dataset, path: Optional[str] = None) -> DicomResult:
+        """Send one dataset with C-STORE over the cached association.
 
-            assoc = ae.associate(
-                self.server_ip,
-                self.server_port,
-                ae_title=self.server_ae_title,
-                evt_handlers=[(evt.EVT_C_STORE, handle_store)]
+        With a path, dataset only needs the header: pynetdicom sends the
+        file's encoded dataset without re-encoding it, provided the file's
+        transfer syntax was accepted. Otherwise the file is read and sent as a
+        Dataset.
+        """
+        try:
+            context = (dataset.SOPClassUID, self.get_transfer_syntaxes(dataset))
+            logger.debug("transfer_syntaxes=%s sop=%s", context[1], context[0])
+        except AttributeError as e:
+            return DicomResult(
+                success=False,
+                message=f"Failed to process DICOM file: {str(e)}",
+                status_code=400
             )
 
-            if assoc.is_established:
-                try:
-                    status = assoc.send_c_store(dataset)
-                    status_code = getattr(status, "Status", None)
-
-                    if status and status_code == 0x0000:
-                        assoc.release()
-                        return DicomResult(
-                            success=True,
-                            message="DICOM file uploaded successfully",
-                            status_code=200
-                        )
-                    else:
-                        error_msg = f"Failed to store DICOM file. Status: {hex(status_code) if status_code else 'Unknown'}"
-                        assoc.abort()
-                        return DicomResult(success=False, message=error_msg, status_code=500)
-
-                except Exception as e:
-                    if assoc.is_established:
-                        assoc.abort()
-                    return DicomResult(success=False, message=f"Error during C-STORE: {str(e)}", status_code=500)
-            else:
+        with self._assoc_lock:
+            assoc = self._ensure_assoc([context])
+            if assoc is None:
                 return DicomResult(
                     success=False,
                     message="Failed to establish association",
                     status_code=500
                 )
 
-        except Exception as e:
+            try:
+                if path is None:
+                    status = assoc.send_c_store(dataset)
+                else:
+                    try:
+                        status = assoc.send_c_store(path)
+                    except (AttributeError, ValueError) as e:
+                        # No file meta, or its transfer syntax was not accepted;
+                        # raised before anything is sent
+                        logger.debug("Sending %s as a dataset: %s", path, e)
+                        status = assoc.send_c_store(dcmread(path, defer_size=DEFER_SIZE))
+            except (RuntimeError, ValueError, OSError) as e:
+                logger.exception("Error during C-STORE")
+                self._drop_assoc(e)
+                return DicomResult(success=False, message=f"Error during C-STORE: {str(e)}", status_code=500)
+
+        status_code = getattr(status, "Status", None)
+        if status and status_code == 0x0000:
             return DicomResult(
-                success=False,
-                message=f"Failed to process DICOM file: {str(e)}",
-                status_code=400
+                success=True,
+                message="DICOM file uploaded successfully",
+                status_code=200
             )
+        error_msg = f"Failed to store DICOM file. Status: {hex(status_code) if status_code else 'Unknown'}"
+        return DicomResult(success=False, message=error_msg, status_code=500)
 
     async def find_studies(self, query_params: Dict) -> DicomResult:
         """Perform C-FIND operation for studies."""
+        return await asyncio.to_thread(self._find_studies, query_params)
+
+    async def find_studies_stream(self, query_params: Dict) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Perform C-FIND operation for studies, yielding each match as it arrives.
+        
+        Args:
+            query_params: Dictionary of DICOM attributes to query for
+            
+        Yields:
+            One dict per matching study (or patient), in the order the PACS sends them
+        """
+        matches = queue.Queue(maxsize=_RECEIVE_QUEUE_SIZE)
+        stop = threading.Event()
+        producer = asyncio.create_task(asyncio.to_thread(self._stream_find, query_params, matches, stop))
         try:
-            ae = AE(ae_title=self.local_ae_title)
-            ae.add_requested_context(PatientRootQueryRetrieveInformationModelFind)
-            ae.add_requested_context(StudyRootQueryRetrieveInformationModelFind)
-            ae.dimse_timeout = self.timeout
-            ae.acse_timeout = self.timeout
-            ae.network_timeout = self.timeout
+            while True:
+                result_dict = await asyncio.to_thread(matches.get)
+                if result_dict is _SENTINEL:
+                    break
+                yield result_dict
+        finally:
+            if not producer.done():
+                # The client went away, make room so a blocked put returns and
+                # the producer sees the stop flag
+                stop.set()
+                while True:
+                    try:
+                        matches.get_nowait()
+                    except queue.Empty:
+                        break
 
-            ds = Dataset()
-            for key, value in query_params.items():
-                if value is not None:
-                    setattr(ds, key, value)
-            if 'PatientID' in query_params and not any(param in query_params for param in ['StudyInstanceUID', 'SeriesInstanceUID']):
-                ds.QueryRetrieveLevel = 'PATIENT'
-                model = PatientRootQueryRetrieveInformationModelFind
-                model_name = "PatientRootQueryRetrieveInformationModelFind"
-            else:
-                ds.QueryRetrieveLevel = 'STUDY'
-                model = StudyRootQueryRetrieveInformationModelFind
-                model_name = "StudyRootQueryRetrieveInformationModelFind"
-            logger.info(f"C-FIND query parameters: {query_params}")
-            logger.info(f"QueryRetrieveLevel: {ds.QueryRetrieveLevel}")
-            logger.info(f"Using model: {model_name}")
-
-            results = []
-            assoc = ae.associate(
-                self.server_ip,
-                self.server_port,
-                ae_title=self.server_ae_title
+    def _find_studies(self, query_params: Dict) -> DicomResult:
+        """Blocking body of find_studies."""
+        try:
+            ds, model = self._build_find_query(query_params)
+        except (TypeError, ValueError) as e:
+            logger.error("Invalid C-FIND query: %s", e)
+            return DicomResult(
+                success=False,
+                message=f"Invalid C-FIND query: {str(e)}",
+                status_code=400
             )
 
-            if assoc.is_established:
-                try:
-                    logger.info(f"Sending C-FIND request to {self.server_ip}:{self.server_port}")
-                    responses = assoc.send_c_find(ds, model)
-                    response_count = 0
-                    for status, identifier in responses:
-                        response_count += 1
-                        if status:
-                            status_code = status.Status
-                            logger.info(f"C-FIND response #{response_count} - status: 0x{status_code:04X}")
-                            category = code_to_category(status_code)
-                            if status_code == 0xFF00:
-                                if identifier:
-                                    result_dict = {}
-                                    logger.debug(f"Identifier received: {identifier}")
-                                    for elem in identifier:
-                                        if elem.keyword:
-                                            try:
-                                                if hasattr(elem, 'value'):
-                                                    if elem.VR in ['PN', 'DA', 'TM', 'DT', 'LO', 'SH', 'CS', 'UI']:
-                                                        result_dict[elem.keyword] = str(elem.value)
-                                                    elif elem.VR == 'SQ':
-                                                        result_dict[elem.keyword] = "Sequence data available"
-                                                    else:
-                                                        result_dict[elem.keyword] = elem.value
-                                            except Exception as e:
-                                                logger.warning(f"Error processing element {elem.keyword}: {str(e)}")
-                                                result_dict[elem.keyword] = f"Error: {str(e)}"
-                                    if result_dict:
-                                        results.append(result_dict)
-                                        logger.info(f"Added result: {result_dict.get('StudyInstanceUID', 'Unknown Study')}")
-                                    else:
-                                        logger.warning("Received empty identifier, skipping")
-                                else:
-                                    logger.warning("Received pending status but no identifier")
-                            
-                            elif status_code == 0x0000:
-                                logger.info("C-FIND completed successfully")
-                            
-                            elif category in ['Cancel', 'Failure', 'Warning']:
-                                logger.warning(f"C-FIND issue: {category} - Status: 0x{status_code:04X}")
-                                if identifier:
-                                    logger.warning(f"Error identifier: {identifier}")
-                        else:
-                            logger.error("Connection timed out, was aborted or received invalid response")
-                    
-                    assoc.release()
-                    
-                    logger.info(f"C-FIND completed with {len(results)} results")
-                    
-                    return DicomResult(
-                        success=True,
-                        message=f"C-FIND completed successfully with {len(results)} results",
-                        data=results,
-                        status_code=200
-                    )
-                    
-                except Exception as e:
-                    logger.error(f"Error during C-FIND: {str(e)}")
-                    if assoc.is_established:
-                        assoc.abort()
-                    return DicomResult(
-                        success=False,
-                        message=f"Error during C-FIND: {str(e)}",
-                        status_code=500
-                    )
-            else:
-                logger.error(f"Failed to establish association for C-FIND with {self.server_ip}:{self.server_port}")
+        with self._assoc_lock:
+            assoc = self._ensure_assoc(_FIND_CONTEXTS)
+            if assoc is None:
                 return DicomResult(
                     success=False,
                     message=f"Failed to establish association for C-FIND with {self.server_ip}:{self.server_port}",
                     status_code=500
                 )
-            
-        except Exception as e:
-            logger.error(f"Exception in find_studies: {str(e)}")
-            return DicomResult(
-                success=False,
-                message=f"Exception in find_studies: {str(e)}",
-                status_code=500
-            )
+
+            try:
+                results = list(self._iter_find_results(assoc, ds, model))
+            except (RuntimeError, ValueError, OSError) as e:
+                logger.exception("Error during C-FIND")
+                self._drop_assoc(e)
+                return DicomResult(
+                    success=False,
+                    message=f"Error during C-FIND: {str(e)}",
+                    status_code=500
+                )
+            except BaseException:
+                # Unread responses would be read by the next request on the
+                # cached association, abort it
+                self._drop_assoc()
+                raise
+
+        # The association is kept open for the next request
+        logger.info("C-FIND completed with %d results", len(results))
+        
+        return DicomResult(
+            success=True,
+            message=f"C-FIND completed successfully with {len(results)} results",
+            data=results,
+            status_code=200
+        )
+
+    def _stream_find(self, query_params: Dict, matches: queue.Queue, stop: threading.Event) -> None:
+        """Blocking producer of find_studies_stream, always ends with the sentinel.
+
+        The find runs on an association of its own: behind a slow client the
+        producer blocks on the bounded queue for as long as the stream lasts,
+        which must not hold up the finds, stores and retrievals sharing the
+        cached association.
+        """
+        try:
+            ds, model = self._build_find_query(query_params)
+            ae = self.setup_ae()
+            for abstract_syntax, transfer_syntaxes in _FIND_CONTEXTS:
+                ae.add_requested_context(abstract_syntax, list(transfer_syntaxes))
+            assoc = self._associate(ae)
+            if assoc is None:
+                logger.error("Failed to establish association for C-FIND with %s:%s", self.server_ip, self.server_port)
+                return
+            completed = False
+            error: Optional[Exception] = None
+            try:
+                for result_dict in self._iter_find_results(assoc, ds, model):
+                    if stop.is_set():
+                        # Pending responses are still queued on the association,
+                        # aborted below
+                        return
+                    matches.put(result_dict)
+                completed = True
+            except Exception as e:
+                # Nobody awaits the producer, anything raised here is only logged
+                logger.exception("Error during C-FIND")
+                error = e
+            finally:
+                if completed:
+                    assoc.release()
+                else:
+                    _end_association(assoc, error)
+        except (TypeError, ValueError) as e:
+            logger.error("Invalid C-FIND query: %s", e)
+        finally:
+            matches.put(_SENTINEL)
+
+    def _build_find_query(self, query_params: Dict) -> Tuple[Dataset, str]:
+        """Build the C-FIND identifier and pick the information model for query_params."""
+        ds = Dataset()
+        for key, value in query_params.items():
+            if value is None:
+                continue
+            tag_vr = _keyword_tag_vr(key)
+            if tag_vr is None:
+                setattr(ds, key, value)
+            else:
+                ds.add_new(*tag_vr, value)
+        if 'PatientID' in query_params and not any(param in query_params for param in ['StudyInstanceUID', 'SeriesInstanceUID']):
+            ds.QueryRetrieveLevel = 'PATIENT'
+            model = PatientRootQueryRetrieveInformationModelFind
+            model_name = "PatientRootQueryRetrieveInformationModelFind"
+        else:
+            ds.QueryRetrieveLevel = 'STUDY'
+            model = StudyRootQueryRetrieveInformationModelFind
+            model_name = "StudyRootQueryRetrieveInformationModelFind"
+        logger.info("C-FIND query parameters: %s", query_params)
+        logger.info("QueryRetrieveLevel: %s", ds.QueryRetrieveLevel)
+        logger.info("Using model: %s", model_name)
+        return ds, model
+
+    def _iter_find_results(self, assoc: Association, ds: Dataset, model: str) -> Iterator[Dict[str, Any]]:
+        """Send a C-FIND and yield the result dict of each pending response."""
+        logger.info("Sending C-FIND request to %s:%s", self.server_ip, self.server_port)
+        responses = assoc.send_c_find(ds, model)
+        response_count = 0
+        for status, identifier in responses:
+            response_count += 1
+            if status:
+                status_code = status.Status
+                logger.debug("C-FIND response #%d - status: 0x%04X", response_count, status_code)
+                if status_code == 0xFF00:
+                    if identifier:
+                        result_dict = _identifier_dict(identifier)
+                        if result_dict:
+                            logger.debug("Added result: %s", result_dict.get('StudyInstanceUID', 'Unknown Study'))
+                            yield result_dict
+                        else:
+                            logger.warning("Received empty identifier, skipping")
+                    else:
+                        logger.warning("Received pending status but no identifier")
+                
+                elif status_code == 0x0000:
+                    logger.info("C-FIND completed successfully")
+                
+                elif (category := _status_category(status_code)) in _ISSUE_CATEGORIES:
+                    logger.warning("C-FIND issue: %s - Status: 0x%04X", category, status_code)
+                    if identifier:
+                        logger.warning("Error identifier: %s", identifier)
+            else:
+                logger.error("Connection timed out, was aborted or received invalid response")
 
     def get_study(self, study_instance_uid: str) -> DicomResult:
         """Retrieve all DICOM data for a study using C-GET."""
@@ -319,8 +771,8 @@ class DicomNetworkInterfaceImp(BaseService, DicomNetworkInterface):
         #         status_code=400
         #     )
 
-        # Add the requested presentation contexts
-        ae.add_requested_context(PatientRootQueryRetrieveInformationModelGet)
+        # Add the requested presentation contexts (the Q/R GET context was already
+        # requested above, requesting it twice only duplicates the context ID)
         # ae.add_requested_context(UltrasoundImageStorage)
         ae.add_requested_context(CTImageStorage, ['1.2.840.10008.1.2.5', '1.2.840.10008.1.2.4.50', '1.2.840.10008.1.2.4.51', '1.2.840.10008.1.2.4.57', '1.2.840.10008.1.2', '1.2.840.10008.1.2.1'])
 
@@ -429,260 +881,602 @@ class DicomNetworkInterfaceImp(BaseService, DicomNetworkInterface):
                 status_code=500
             )
 
-    async def get_study_with_pixels(self, study_instance_uid: str) -> DicomResult:
+    async def get_study_with_pixels(
+        self,
+        study_instance_uid: str,
+        include_details: bool = False,
+        detail_level: DetailLevel = "full",
+    ) -> DicomResult:
         """
         Retrieve complete DICOM data for a study including pixel data using C-GET.
         
         Args:
             study_instance_uid: The Study Instance UID to retrieve
+            include_details: Repeat the patient/study level attributes in every
+                instance; by default they are omitted and the summary only
+                references the study by its UID
+            detail_level: "summary" only counts instances and series, "series"
+                adds the series level fields, "full" also converts every
+                element of every instance
             
         Returns:
             DicomResult containing the retrieved DICOM data
         """
-        try:
-            # Set up the Application Entity
-            ae = AE(ae_title=self.local_ae_title)
-            
-            # Add the requested presentation contexts for Query/Retrieve
-            ae.add_requested_context(StudyRootQueryRetrieveInformationModelGet)
+        return await self._run_retrieval(
+            self._get_study_with_pixels, study_instance_uid, include_details, detail_level, False
+        )
+
+    async def get_study_with_pixels_via_move(
+        self,
+        study_instance_uid: str,
+        include_details: bool = False,
+        detail_level: DetailLevel = "full",
+    ) -> DicomResult:
+        """
+        Retrieve a study like get_study_with_pixels, using C-MOVE instead of C-GET.
+        
+        The PACS sends the instances to the local storage SCP, on associations
+        of its own, which it can open in parallel. It must know the local AE
+        title as a move destination at this host and storage_scp_port.
+        
+        Args:
+            study_instance_uid: The Study Instance UID to retrieve
+            include_details: See get_study_with_pixels
+            detail_level: See get_study_with_pixels
             
-            # Add common storage contexts that might be needed for the retrieved images
-            storage_contexts = [
-                CTImageStorage,
-                MRImageStorage,
-                UltrasoundImageStorage,
-                UltrasoundMultiFrameImageStorage,
-            ]
+        Returns:
+            DicomResult containing the retrieved DICOM data
+        """
+        return await self._run_retrieval(
+            self._get_study_with_pixels, study_instance_uid, include_details, detail_level, True
+        )
+
+    def _get_study_with_pixels(
+        self,
+        study_instance_uid: str,
+        include_details: bool,
+        detail_level: DetailLevel,
+        via_move: bool,
+    ) -> DicomResult:
+        """Blocking body of get_study_with_pixels and get_study_with_pixels_via_move."""
+        # The spool is removed whichever way the retrieval ends
+        with tempfile.TemporaryDirectory(prefix="cget-") as spool_dir:
+            return self._retrieve_study(study_instance_uid, include_details, detail_level, via_move, spool_dir)
+
+    def _retrieve_study(
+        self,
+        study_instance_uid: str,
+        include_details: bool,
+        detail_level: DetailLevel,
+        via_move: bool,
+        spool_dir: str,
+    ) -> DicomResult:
+        """Retrieve and summarize a study, spooling received instances to spool_dir."""
+        # Create our query dataset
+        ds = Dataset()
+        ds.QueryRetrieveLevel = 'STUDY'
+        ds.StudyInstanceUID = study_instance_uid
+        
+        # Received datasets are spooled to a temporary directory and their paths
+        # go through a bounded queue to a consumer thread, so summarizing
+        # overlaps with the transfer and only headers are held in memory. In
+        # "full" mode the consumer hands the element conversion to a process pool
+        received = queue.Queue(maxsize=_RECEIVE_QUEUE_SIZE)
+        # C-MOVE sub-operations may arrive on several associations at once,
+        # next() on a count is atomic
+        received_numbers = itertools.count(1)
+        summary_series = set()
+        series_data = {}
+        summary_pool = self._get_summary_pool() if detail_level == "full" else None
+        
+        def collect_instances():
+            """Summarize queued datasets until the sentinel arrives."""
+            while True:
+                path = received.get()
+                if path is _SENTINEL:
+                    break
+                try:
+                    dataset = dcmread(path, stop_before_pixels=True)
+                    if summary_pool is not None:
+                        result_dict = summary_pool.submit(summarize_file, path, include_details)
+                    else:
+                        result_dict = None
+                    series_uid = _tag_value(dataset, _SERIES_INSTANCE_UID_TAG)
+                except Exception as e:
+                    # Keep draining, a dead consumer would block handle_store
+                    logger.warning("Error summarizing dataset: %s", e)
+                    continue
+                
+                if series_uid is not None:
+                    # Initialize series data if not already present
+                    series_info = series_data.get(series_uid)
+                    if series_info is None:
+                        series_info = series_data[series_uid] = {
+                            **_tag_values(dataset, _SERIES_TAGS),
+                            'SeriesNumber': _series_number(dataset),
+                            'Rows': _tag_value(dataset, _ROWS_TAG),
+                            'Columns': _tag_value(dataset, _COLUMNS_TAG),
+                            'PixelSpacing': _pixel_spacing(dataset),
+                            'InstanceCount': 0,
+                            'instances': []
+                        }
+                    series_info['InstanceCount'] += 1
+                    if result_dict is not None:
+                        series_info['instances'].append(result_dict)
+                del dataset
+        
+        # Implement handler for C-STORE operations triggered by C-GET
+        def handle_store(event):
+            """Handle a C-STORE request event."""
+            received_number = next(received_numbers)
             
-            # Add each storage context and create role selection items
-            roles = []
-            for storage_class in storage_contexts:
-                ae.add_requested_context(storage_class)
-                # Create SCP/SCU Role Selection items (we'll act as SCP for storage)
-                roles.append(build_role(storage_class, scp_role=True))
+            if detail_level == "summary":
+                # Counting only, nothing is queued or converted
+                series_uid = _tag_value(_read_header(event, _SERIES_INSTANCE_UID_TAG), _SERIES_INSTANCE_UID_TAG)
+                if series_uid is not None:
+                    summary_series.add(series_uid)
+                return 0x0000
             
-            # Set timeouts
-            ae.dimse_timeout = self.timeout
-            ae.acse_timeout = self.timeout
-            ae.network_timeout = self.timeout
+            path = os.path.join(spool_dir, f"{received_number}.dcm")
+            _spool_dataset(event, path)
             
-            # Create our query dataset
-            ds = Dataset()
-            ds.QueryRetrieveLevel = 'STUDY'
-            ds.StudyInstanceUID = study_instance_uid
+            # Blocks while the queue is full, back-pressuring the SCP
+            received.put(path)
             
-            # Store received datasets
-            received_datasets = []
+            logger.debug("Received dataset: %s", event.request.AffectedSOPInstanceUID)
             
-            # Implement handler for C-STORE operations triggered by C-GET
-            def handle_store(event):
-                """Handle a C-STORE request event."""
-                dataset = event.dataset
-                # Add file meta information
-                if event.file_meta:
-                    dataset.file_meta = event.file_meta
-                
-                # Store the dataset in memory
-                received_datasets.append(dataset)
-                
-                logger.info(f"Received dataset: {dataset.SOPInstanceUID if hasattr(dataset, 'SOPInstanceUID') else 'Unknown'}")
-                
-                # Return success status
-                return 0x0000
-            
-            # Associate with the peer AE
-            assoc = ae.associate(
-                self.server_ip,
-                self.server_port,
-                ae_title=self.server_ae_title,
-                ext_neg=roles,
-                evt_handlers=[(evt.EVT_C_STORE, handle_store)]
-            )
+            # Return success status
+            return 0x0000
+        
+        if via_move:
+            operation = "C-MOVE"
+            # Message IDs are 16 bit
+            message_id = next(self._move_message_ids) % 0xFFFF + 1
+            retrieval = self._move_retrieval(handle_store, message_id)
+        else:
+            operation = "C-GET"
+            retrieval = self._retrieval(handle_store, self._study_storage_classes(study_instance_uid))
+        with retrieval as assoc:
+            if assoc is None:
+                return DicomResult(
+                    success=False,
+                    message=f"Failed to establish association for {operation} with {self.server_ip}:{self.server_port}",
+                    status_code=500
+                )
             
-            if assoc.is_established:
-                try:
-                    logger.info(f"Association established for C-GET of study {study_instance_uid}")
-                    
-                    # Send the C-GET request
-                    responses = assoc.send_c_get(
-                        ds, 
-                        StudyRootQueryRetrieveInformationModelGet
-                    )
-                    
-                    # Process the responses
-                    completed = False
-                    total_instances = 0
-                    remaining = 0
-                    failed = 0
-                    warning = 0
-                    
-                    for status, identifier in responses:
-                        if status:
-                            status_code = status.Status
-                            logger.info(f"C-GET status: 0x{status_code:04X}")
-                            
-                            category = code_to_category(status_code)
-                            
-                            if status_code == 0x0000:  # Success
-                                completed = True
-                                if hasattr(status, 'NumberOfCompletedSuboperations'):
-                                    total_instances = status.NumberOfCompletedSuboperations
-                                logger.info(f"C-GET completed successfully, received {total_instances} instances")
-                            
-                            elif category == 'Pending':
-                                if hasattr(status, 'NumberOfRemainingSuboperations'):
-                                    remaining = status.NumberOfRemainingSuboperations
-                                if hasattr(status, 'NumberOfCompletedSuboperations'):
-                                    total_instances = status.NumberOfCompletedSuboperations
-                                if hasattr(status, 'NumberOfFailedSuboperations'):
-                                    failed = status.NumberOfFailedSuboperations
-                                if hasattr(status, 'NumberOfWarningSuboperations'):
-                                    warning = status.NumberOfWarningSuboperations
-                                
-                                logger.info(f"C-GET pending: completed={total_instances}, remaining={remaining}, failed={failed}, warning={warning}")
-                                
-                            elif category in ['Cancel', 'Failure', 'Warning']:
-                                logger.warning(f"C-GET issue: {category} - Status: 0x{status_code:04X}")
-                        else:
-                            logger.error("Connection timed out, was aborted or received invalid response")
-                    
-                    # Process the received datasets
-                    results = []
-                    series_data = {}
-                    
-                    for dataset in received_datasets:
-                        result_dict = {}
-                        
-                        # Add key identifiers if available
-                        if hasattr(dataset, 'SOPInstanceUID'):
-                            result_dict['SOPInstanceUID'] = str(dataset.SOPInstanceUID)
-                        
-                        if hasattr(dataset, 'SeriesInstanceUID'):
-                            series_uid = str(dataset.SeriesInstanceUID)
-                            result_dict['SeriesInstanceUID'] = series_uid
-                            
-                            # Initialize series data if not already present
-                            if series_uid not in series_data:
-                                series_data[series_uid] = {
-                                    'SeriesDescription': getattr(dataset, 'SeriesDescription', '') if hasattr(dataset, 'SeriesDescription') else '',
-                                    'Modality': getattr(dataset, 'Modality', '') if hasattr(dataset, 'Modality') else '',
-                                    'SeriesNumber': getattr(dataset, 'SeriesNumber', '') if hasattr(dataset, 'SeriesNumber') else '',
-                                    'instances': []
-                                }
-                        
-                        if hasattr(dataset, 'StudyInstanceUID'):
-                            result_dict['StudyInstanceUID'] = str(dataset.StudyInstanceUID)
-                        
-                        # Process all elements in the dataset
-                        for elem in dataset:
-                            if elem.keyword and elem.keyword != 'PixelData' and hasattr(elem, 'value'):
-                                try:
-                                    if elem.VR in ['PN', 'DA', 'TM', 'DT', 'LO', 'SH', 'CS', 'UI']:
-                                        result_dict[elem.keyword] = str(elem.value)
-                                    elif elem.VR == 'SQ':
-                                        result_dict[elem.keyword] = "Sequence data available"
-                                    elif elem.VR in ['OB', 'OW', 'OF', 'OD', 'UN']:
-                                        result_dict[elem.keyword] = f"{elem.VR} data ({len(elem.value)} bytes)"
-                                    else:
-                                        if callable(elem.value):
-                                            result_dict[elem.keyword] = f"Function: {elem.keyword}"
-                                        elif hasattr(elem.value, '__dict__'):
-                                            result_dict[elem.keyword] = f"Object: {elem.keyword}"
-                                        else:
-                                            result_dict[elem.keyword] = str(elem.value)
-                                except Exception as e:
-                                    result_dict[elem.keyword] = f"{elem.VR} data (conversion error)"
-                                    logger.warning(f"Error converting {elem.keyword}: {str(e)}")
-                        
-                        # Check if pixel data exists
-                        if hasattr(dataset, 'PixelData'):
-                            result_dict['HasPixelData'] = True
-                            result_dict['PixelDataLength'] = len(dataset.PixelData)
-                            
-                            # Add image dimensions if available
-                            if hasattr(dataset, 'Rows') and hasattr(dataset, 'Columns'):
-                                result_dict['ImageDimensions'] = f"{dataset.Rows}x{dataset.Columns}"
-                            
-                            # Add pixel spacing if available
-                            if hasattr(dataset, 'PixelSpacing'):
-                                try:
-                                    result_dict['PixelSpacing'] = [float(x) for x in dataset.PixelSpacing]
-                                except Exception as e:
-                                    result_dict['PixelSpacing'] = f"Error converting: {str(e)}"
-                        else:
-                            result_dict['HasPixelData'] = False
-                        
-                        results.append(result_dict)
-                        
-                        # Add to series data if we have a series UID
-                        if hasattr(dataset, 'SeriesInstanceUID'):
-                            series_uid = str(dataset.SeriesInstanceUID)
-                            if series_uid in series_data:
-                                series_data[series_uid]['instances'].append(result_dict)
-                    
-                    # Release the association
-                    assoc.release()
-                    
-                    # Create a summary of the results
-                    summary = {
-                        "total_instances": len(received_datasets),
-                        "total_series": len(series_data),
-                        "study_instance_uid": study_instance_uid,
-                        "completed": completed,
-                        "failed_operations": failed,
-                        "warning_operations": warning
-                    }
-                    
-                    # Convert series_data from dict to list for easier consumption
-                    series_list = [
-                        {
-                            "SeriesInstanceUID": series_uid,
-                            "SeriesDescription": series_info['SeriesDescription'],
-                            "Modality": series_info['Modality'],
-                            "SeriesNumber": series_info['SeriesNumber'],
-                            "InstanceCount": len(series_info['instances']),
-                            "instances": series_info['instances']
-                        }
-                        for series_uid, series_info in series_data.items()
-                    ]
-                    
-                    # Sort series by SeriesNumber if available
-                    series_list.sort(key=lambda x: int(x['SeriesNumber']) if x['SeriesNumber'] and str(x['SeriesNumber']).isdigit() else 9999)
-                    
-                    return DicomResult(
-                        success=True,
-                        message=f"Retrieved {len(received_datasets)} DICOM instances for study {study_instance_uid}",
-                        data={
-                            "summary": summary,
-                            "series": series_list
-                        },
-                        status_code=200
-                    )
-                    
-                except Exception as e:
-                    logger.error(f"Error during C-GET: {str(e)}")
-                    if assoc.is_established:
-                        assoc.abort()
-                    return DicomResult(
-                        success=False,
-                        message=f"Error during C-GET: {str(e)}",
-                        status_code=500
+            worker = threading.Thread(target=collect_instances, daemon=True)
+            worker.start()
+            try:
+                logger.info("Sending %s of study %s", operation, study_instance_uid)
+                if via_move:
+                    completed, failed, warning = _consume_retrieve_responses(
+                        assoc.send_c_move(ds, self.local_ae_title, StudyRootQueryRetrieveInformationModelMove, msg_id=message_id),
+                        operation,
                     )
-            else:
-                logger.error(f"Failed to establish association for C-GET with {self.server_ip}:{self.server_port}")
+                else:
+                    completed, failed, warning = self._send_c_get(assoc, ds, StudyRootQueryRetrieveInformationModelGet)
+            except (RuntimeError, ValueError, OSError) as e:
+                logger.exception("Error during %s of study %s", operation, study_instance_uid)
+                _end_association(assoc, e)
                 return DicomResult(
                     success=False,
-                    message=f"Failed to establish association for C-GET with {self.server_ip}:{self.server_port}",
+                    message=f"Error during {operation}: {e}",
                     status_code=500
                 )
-                
-        except Exception as e:
-            logger.error(f"Exception in get_study_with_pixels: {str(e)}")
-            return DicomResult(
-                success=False,
-                message=f"Exception in get_study_with_pixels: {str(e)}",
-                status_code=500
-            )
+            except BaseException:
+                # Unread responses would be read by the next retrieval on the
+                # pooled association, abort it
+                assoc.abort()
+                raise
+            finally:
+                # Wait for the consumer to drain the remaining datasets
+                received.put(_SENTINEL)
+                worker.join()
+        received_count = next(received_numbers) - 1
+        
+        # Collect the instance summaries from the pool, in arrival order
+        for series_info in series_data.values():
+            series_info['instances'] = _completed_summaries(series_info['instances'])
+        
+        # Create a summary of the results
+        summary = {
+            "total_instances": received_count,
+            "total_series": len(summary_series) if detail_level == "summary" else len(series_data),
+            "study_instance_uid": study_instance_uid,
+            "completed": completed,
+            "failed_operations": failed,
+            "warning_operations": warning
+        }
+        return DicomResult(
+            success=True,
+            message=f"Retrieved {received_count} DICOM instances for study {study_instance_uid}",
+            data={
+                "summary": summary,
+                "series": _series_list(series_data)
+            },
+            status_code=200
+        )
+
+    def _ensure_assoc(self, contexts: Iterable[PresentationContextKey]) -> Optional[Association]:
+        """Return the cached association, renegotiating only when it lacks one of contexts.
+
+        The caller must hold _assoc_lock. A renegotiated association requests the
+        union of the previously negotiated and the new contexts, so alternating
+        requests do not keep tearing it down.
+        """
+        contexts = dict.fromkeys(contexts)
+        now = time.monotonic()
+        if self._assoc is not None and self._assoc.is_established:
+            idle = now - self._assoc_last_used
+            if idle < _ASSOC_IDLE_SECONDS and all(context in self._negotiated for context in contexts):
+                self._assoc_last_used = now
+                return self._assoc
+            self._assoc.release()
+        self._assoc = None
+
+        wanted = {**self._negotiated, **contexts}
+        if len(wanted) > _MAX_REQUESTED_CONTEXTS:
+            wanted = contexts
+        ae = self.setup_ae()
+        for abstract_syntax, transfer_syntaxes in wanted:
+            ae.add_requested_context(abstract_syntax, list(transfer_syntaxes))
+
+        assoc = self._associate(ae)
+        if assoc is None:
+            self._negotiated = {}
+            return None
+        self._assoc = assoc
+        self._negotiated = wanted
+        self._assoc_last_used = now
+        self._start_reaper()
+        return assoc
+
+    def _drop_assoc(self, error: Optional[Exception] = None) -> None:
+        """Forget the cached association after a failed operation, see _end_association."""
+        _end_association(self._assoc, error)
+        self._assoc = None
+        self._negotiated = {}
+
+    @contextmanager
+    def _retrieval(
+        self,
+        handle_store: Callable[[evt.Event], int],
+        storage_classes: Optional[Tuple[str, ...]] = None,
+    ) -> Iterator[Optional[Association]]:
+        """Lend a pooled C-GET association, routing its C-STORE sub-operations to handle_store.
+
+        The association is renegotiated if it cannot receive one of
+        storage_classes, by default the CT/MR/US storage classes. Callers that
+        end it after an error get a fresh one next time.
+
+        The store requests arrive on pynetdicom's reactor thread, so the handler
+        of the current retrieval is kept on the pooled entry, which the event
+        handler is bound to.
+        """
+        storage_classes = storage_classes or _STORAGE_CONTEXTS
+        with self._get_slots:
+            pooled = self._checkout_get_assoc(storage_classes)
+            assoc = self._ensure_get_assoc(pooled, storage_classes)
+            pooled.store_handler = handle_store
+            try:
+                yield assoc
+            finally:
+                pooled.store_handler = None
+                pooled.last_used = time.monotonic()
+                self._checkin_get_assoc(pooled)
+
+    @contextmanager
+    def _move_retrieval(self, handle_store: Callable[[evt.Event], int], message_id: int) -> Iterator[Optional[Association]]:
+        """Open a C-MOVE association, routing the sub-operations of message_id to handle_store.
+
+        Yields None if the storage SCP could not be started or the association
+        not established.
+        """
+        if not self._ensure_storage_scp():
+            yield None
+            return
+        assoc = self._associate(self.setup_ae([StudyRootQueryRetrieveInformationModelMove]))
+        if assoc is None:
+            yield None
+            return
+        with self._move_lock:
+            self._move_receivers[message_id] = handle_store
+        try:
+            yield assoc
+        finally:
+            with self._move_lock:
+                del self._move_receivers[message_id]
+            if assoc.is_established:
+                assoc.release()
+
+    def _ensure_storage_scp(self) -> bool:
+        """Start the storage SCP receiving C-MOVE sub-operations, once. False if it could not be started."""
+        with self._move_lock:
+            if self._storage_scp is not None:
+                return True
+            if self._closed.is_set():
+                return False
+            ae = AE(ae_title=self.local_ae_title)
+            # Instances are spooled as received, so any transfer syntax will do
+            for context in StoragePresentationContexts:
+                ae.add_supported_context(context.abstract_syntax, ALL_TRANSFER_SYNTAXES)
+            ae.dimse_timeout = self.timeout
+            ae.acse_timeout = self.timeout
+            ae.network_timeout = self.timeout
+            ae.maximum_pdu_size = 0
+            try:
+                self._storage_scp = ae.start_server(
+                    ("0.0.0.0", self.storage_scp_port),
+                    block=False,
+                    evt_handlers=[(evt.EVT_C_STORE, self._dispatch_moved_store)],
+                )
+            except OSError:
+                logger.exception("Could not start the storage SCP on port %s", self.storage_scp_port)
+                return False
+            logger.info("Storage SCP %s listening on port %s", self.local_ae_title, self.storage_scp_port)
+            return True
+
+    def _dispatch_moved_store(self, event: evt.Event) -> int:
+        """Hand a C-STORE sub-operation of a C-MOVE to the retrieval that sent it."""
+        message_id = event.request.MoveOriginatorMessageID
+        with self._move_lock:
+            handle_store = self._move_receivers.get(message_id)
+            if handle_store is None and message_id is None and len(self._move_receivers) == 1:
+                # The move originator is optional, unambiguous while one C-MOVE runs
+                handle_store = next(iter(self._move_receivers.values()))
+        if handle_store is None:
+            logger.warning("C-STORE request outside of a C-MOVE (message ID %s), refusing it", message_id)
+            return 0xA700  # Out of resources
+        return handle_store(event)
+
+    def _checkout_get_assoc(self, storage_classes: Tuple[str, ...]) -> _GetAssociation:
+        """Take an idle pooled association, preferring one that can receive storage_classes."""
+        with self._get_pool_lock:
+            for index in range(len(self._get_idle) - 1, -1, -1):
+                negotiated = self._get_idle[index].storage_classes
+                if all(storage_class in negotiated for storage_class in storage_classes):
+                    return self._get_idle.pop(index)
+            if self._get_idle:
+                return self._get_idle.pop()
+        return _GetAssociation()
+
+    def _checkin_get_assoc(self, pooled: _GetAssociation) -> None:
+        """Return an association to the pool, unless it has ended or the service is closed."""
+        if pooled.assoc is None or not pooled.assoc.is_established:
+            return
+        with self._get_pool_lock:
+            if not self._closed.is_set():
+                self._get_idle.append(pooled)
+                return
+        pooled.assoc.release()
+
+    def _ensure_get_assoc(self, pooled: _GetAssociation, storage_classes: Tuple[str, ...]) -> Optional[Association]:
+        """Return the association of pooled, establishing it if needed.
+
+        As in _ensure_assoc, a renegotiated association requests the union of
+        the previously negotiated and the new storage classes.
+        """
+        if pooled.assoc is not None and pooled.assoc.is_established:
+            idle = time.monotonic() - pooled.last_used
+            if idle < _ASSOC_IDLE_SECONDS and all(
+                storage_class in pooled.storage_classes for storage_class in storage_classes
+            ):
+                return pooled.assoc
+            pooled.assoc.release()
+        pooled.assoc = None
+
+        # One context is taken by the Get model
+        wanted = tuple(dict.fromkeys((*pooled.storage_classes, *storage_classes)))
+        if len(wanted) >= _MAX_REQUESTED_CONTEXTS:
+            wanted = storage_classes[:_MAX_REQUESTED_CONTEXTS - 1]
+        ae = self.setup_ae((StudyRootQueryRetrieveInformationModelGet, *wanted))
+        pooled.assoc = self._associate(
+            ae,
+            ext_neg=list(_storage_roles(wanted)),
+            evt_handlers=[(evt.EVT_C_STORE, self._dispatch_store, [pooled])],
+        )
+        if pooled.assoc is None:
+            pooled.storage_classes = ()
+            return None
+        pooled.storage_classes = wanted
+        self._start_reaper()
+        return pooled.assoc
+
+    def _study_storage_classes(self, study_instance_uid: str, discover: bool = True) -> Optional[Tuple[str, ...]]:
+        """Return the SOP classes of a study, None if they are not known.
+
+        They come from a STUDY level C-FIND for SOPClassesInStudy, cached for
+        _SOP_CLASSES_TTL_SECONDS. With discover=False only the cache is consulted.
+        """
+        now = time.monotonic()
+        cached = self._study_sop_classes.get(study_instance_uid)
+        if cached is not None and now - cached[0] < _SOP_CLASSES_TTL_SECONDS:
+            return cached[1]
+        if not discover:
+            return None
+        
+        ds = Dataset()
+        ds.QueryRetrieveLevel = 'STUDY'
+        ds.StudyInstanceUID = study_instance_uid
+        ds.SOPClassesInStudy = ''
+        
+        sop_classes = None
+        with self._assoc_lock:
+            assoc = self._ensure_assoc(_FIND_CONTEXTS)
+            if assoc is None:
+                return None
+            try:
+                for status, identifier in assoc.send_c_find(ds, StudyRootQueryRetrieveInformationModelFind):
+                    if status and status.Status in _PENDING_STATUSES and identifier is not None:
+                        value = _tag_value(identifier, _SOP_CLASSES_IN_STUDY_TAG)
+                        if value:
+                            values = value if isinstance(value, MultiValue) else [value]
+                            sop_classes = tuple(dict.fromkeys(values))
+            except (RuntimeError, ValueError, OSError) as e:
+                logger.exception("Error during C-FIND of the SOP classes in study %s", study_instance_uid)
+                self._drop_assoc(e)
+                return None
+            
+            # Peers that do not return SOPClassesInStudy fall back to the defaults
+            if sop_classes is None:
+                return None
+            if study_instance_uid not in self._study_sop_classes and len(self._study_sop_classes) >= _SOP_CLASSES_CACHE_SIZE:
+                del self._study_sop_classes[next(iter(self._study_sop_classes))]
+            self._study_sop_classes[study_instance_uid] = (now, sop_classes)
+        logger.debug("SOP classes in study %s: %s", study_instance_uid, sop_classes)
+        return sop_classes
+
+    def _dispatch_store(self, event: evt.Event, pooled: _GetAssociation) -> int:
+        """Hand a C-STORE sub-operation to the retrieval currently using the association."""
+        handle_store = pooled.store_handler
+        if handle_store is None:
+            logger.warning("C-STORE request outside of a retrieval, refusing it")
+            return 0xA700  # Out of resources
+        return handle_store(event)
+
+    def _start_reaper(self) -> None:
+        """Start the idle association reaper, once."""
+        if self._reaper is None and not self._closed.is_set():
+            self._reaper = threading.Thread(target=self._reap_idle, name="dicom-assoc-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reap_idle(self) -> None:
+        """Release cached associations left idle for _ASSOC_IDLE_SECONDS, until close()."""
+        while not self._closed.wait(_ASSOC_IDLE_SECONDS):
+            # An association in use holds its lock, skip it until the next round
+            if self._assoc_lock.acquire(blocking=False):
+                try:
+                    if self._assoc is not None and time.monotonic() - self._assoc_last_used >= _ASSOC_IDLE_SECONDS:
+                        if self._assoc.is_established:
+                            self._assoc.release()
+                        self._assoc = None
+                        self._negotiated = {}
+                finally:
+                    self._assoc_lock.release()
+            # Pooled C-GET associations in use are not in the idle list
+            with self._get_pool_lock:
+                now = time.monotonic()
+                expired = [pooled for pooled in self._get_idle if now - pooled.last_used >= _ASSOC_IDLE_SECONDS]
+                self._get_idle = [pooled for pooled in self._get_idle if now - pooled.last_used < _ASSOC_IDLE_SECONDS]
+            for pooled in expired:
+                if pooled.assoc.is_established:
+                    pooled.assoc.release()
+
+    def _link_cached_instance(self, sop_instance_uid: str, path: str) -> bool:
+        """Hard link the cached copy of an instance to path, False if it is not cached.
+
+        The caller owns the link, so the copy may be evicted while it is read.
+        """
+        with self._instance_cache_lock:
+            entry = self._instance_cache.get(sop_instance_uid)
+            if entry is None:
+                return False
+            try:
+                os.link(entry[0], path)
+            except OSError:
+                # The cached file is gone, forget it
+                del self._instance_cache[sop_instance_uid]
+                self._instance_cache_bytes -= entry[1]
+                return False
+            self._instance_cache.move_to_end(sop_instance_uid)
+            return True
+
+    def _cache_instance(self, sop_instance_uid: str, path: str) -> None:
+        """Keep a spooled instance in the instance cache, evicting the least recently used beyond the budget."""
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        if size > _INSTANCE_CACHE_MAX_BYTES:
+            return
+        with self._instance_cache_lock:
+            if self._closed.is_set() or sop_instance_uid in self._instance_cache:
+                return
+            if self._instance_cache_dir is None:
+                self._instance_cache_dir = tempfile.mkdtemp(prefix="instance-cache-")
+            self._instance_cache_files += 1
+            cached_path = os.path.join(self._instance_cache_dir, f"{self._instance_cache_files}.dcm")
+            try:
+                # Spool and cache directories normally share a file system
+                os.link(path, cached_path)
+            except OSError:
+                try:
+                    shutil.copyfile(path, cached_path)
+                except OSError:
+                    logger.warning("Could not cache instance %s", sop_instance_uid, exc_info=True)
+                    return
+            self._instance_cache[sop_instance_uid] = (cached_path, size)
+            self._instance_cache_bytes += size
+            while self._instance_cache_bytes > _INSTANCE_CACHE_MAX_BYTES:
+                _, (evicted_path, evicted_size) = self._instance_cache.popitem(last=False)
+                self._instance_cache_bytes -= evicted_size
+                try:
+                    os.remove(evicted_path)
+                except OSError:
+                    pass
+
+    async def _run_retrieval(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking retrieval in the retrieval pool without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._retrieval_pool, partial(func, *args))
+
+    def _get_summary_pool(self) -> ProcessPoolExecutor:
+        """Return the process pool used to summarize retrieved instances."""
+        with self._summary_pool_lock:
+            if self._summary_pool is None:
+                # spawn rather than fork, the server process runs several threads
+                self._summary_pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"))
+            return self._summary_pool
+
+    def close(self) -> None:
+        """Release the cached associations, shut down the worker pools and remove the instance cache."""
+        self._closed.set()
+        self._retrieval_pool.shutdown(wait=False, cancel_futures=True)
+        with self._instance_cache_lock:
+            if self._instance_cache_dir is not None:
+                shutil.rmtree(self._instance_cache_dir, ignore_errors=True)
+                self._instance_cache_dir = None
+            self._instance_cache.clear()
+            self._instance_cache_bytes = 0
+        with self._move_lock:
+            if self._storage_scp is not None:
+                self._storage_scp.shutdown()
+                self._storage_scp = None
+        # Associations in use are released when their retrieval returns them
+        with self._get_pool_lock:
+            idle, self._get_idle = self._get_idle, []
+        for pooled in idle:
+            if pooled.assoc.is_established:
+                pooled.assoc.release()
+        with self._assoc_lock:
+            if self._assoc is not None and self._assoc.is_established:
+                self._assoc.release()
+            self._assoc = None
+            self._negotiated = {}
+        with self._summary_pool_lock:
+            if self._summary_pool is not None:
+                self._summary_pool.shutdown(cancel_futures=True)
+                self._summary_pool = None
+
+    def _associate(self, ae: AE, **kwargs: Any) -> Optional[Association]:
+        """Associate with the configured peer, returning None if it was not established."""
+        try:
+            assoc = ae.associate(self.server_ip, self.server_port, ae_title=self.server_ae_title, **kwargs)
+        except (RuntimeError, ValueError, OSError):
+            logger.exception("Error requesting association with %s:%s", self.server_ip, self.server_port)
+            return None
+        if not assoc.is_established:
+            logger.error("Failed to establish association with %s:%s", self.server_ip, self.server_port)
+            return None
+        return assoc
+
+    def _send_c_get(self, assoc: Association, ds: Dataset, model: str) -> Tuple[bool, int, int]:
+        """Send a C-GET and consume its responses.
+
+        Returns:
+            (completed, failed sub-operations, warning sub-operations)
+        """
+        return _consume_retrieve_responses(assoc.send_c_get(ds, model), "C-GET")
 
     async def get_instance_with_pixels(self, study_instance_uid: str, series_instance_uid: str, sop_instance_uid: str) -> DicomResult:
         """
@@ -696,152 +1490,297 @@ class DicomNetworkInterfaceImp(BaseService, DicomNetworkInterface):
         Returns:
             DicomResult containing the instance metadata and pixel data
         """
-        try:
-            # Set up the Application Entity
-            ae = AE(ae_title=self.local_ae_title)
+        return await self._run_retrieval(
+            self._get_instance, study_instance_uid, series_instance_uid, sop_instance_uid, False
+        )
+
+    async def get_instance_metadata(self, study_instance_uid: str, series_instance_uid: str, sop_instance_uid: str) -> DicomResult:
+        """
+        Retrieve the metadata of a specific DICOM instance, without reading its pixel data.
+        
+        Args:
+            study_instance_uid: The Study Instance UID
+            series_instance_uid: The Series Instance UID
+            sop_instance_uid: The SOP Instance UID
             
-            # Add the requested presentation context for Query/Retrieve
-            ae.add_requested_context(StudyRootQueryRetrieveInformationModelGet)
+        Returns:
+            DicomResult containing the instance metadata
+        """
+        return await self._run_retrieval(
+            self._get_instance, study_instance_uid, series_instance_uid, sop_instance_uid, True
+        )
+
+    async def get_instance_pixels(self, study_instance_uid: str, series_instance_uid: str, sop_instance_uid: str) -> DicomResult:
+        """
+        Retrieve a specific DICOM instance as an encoded Part 10 file.
+        
+        Args:
+            study_instance_uid: The Study Instance UID
+            series_instance_uid: The Series Instance UID
+            sop_instance_uid: The SOP Instance UID
             
-            # Add common storage contexts that might be needed
-            storage_contexts = [
-                CTImageStorage,
-                MRImageStorage,
-                UltrasoundImageStorage,
-                UltrasoundMultiFrameImageStorage,
-            ]
+        Returns:
+            DicomResult whose data is the file content, pixel data included
+        """
+        return await self._run_retrieval(
+            self._get_instance_file, study_instance_uid, series_instance_uid, sop_instance_uid
+        )
+
+    async def get_instances_with_pixels(
+        self,
+        study_instance_uid: str,
+        series_instance_uid: str,
+        sop_instance_uids: Optional[List[str]] = None,
+    ) -> DicomResult:
+        """
+        Retrieve several instances of one series with a single SERIES level C-GET.
+        
+        Args:
+            study_instance_uid: The Study Instance UID
+            series_instance_uid: The Series Instance UID
+            sop_instance_uids: The SOP Instance UIDs to return, the whole series if omitted
             
-            # Add each storage context and create role selection items
-            roles = []
-            for storage_class in storage_contexts:
-                ae.add_requested_context(storage_class)
-                # Create SCP/SCU Role Selection items (we'll act as SCP for storage)
-                roles.append(build_role(storage_class, scp_role=True))
+        Returns:
+            DicomResult containing the metadata of each instance, keyed by SOP Instance UID
+        """
+        return await self._run_retrieval(
+            self._get_instances, study_instance_uid, series_instance_uid, sop_instance_uids
+        )
+
+    def _get_instance(
+        self,
+        study_instance_uid: str,
+        series_instance_uid: str,
+        sop_instance_uid: str,
+        stop_before_pixels: bool,
+    ) -> DicomResult:
+        """Blocking body of get_instance_with_pixels and get_instance_metadata."""
+        spool = tempfile.TemporaryDirectory(prefix="cget-")
+        try:
+            received = self._retrieve_instance(study_instance_uid, series_instance_uid, sop_instance_uid, spool.name)
+            if isinstance(received, DicomResult):
+                return received
             
-            # Set timeouts
-            ae.dimse_timeout = self.timeout
-            ae.acse_timeout = self.timeout
-            ae.network_timeout = self.timeout
+            if stop_before_pixels:
+                received_dataset = dcmread(received, stop_before_pixels=True)
+            else:
+                # Large elements are only read from the spool file when accessed
+                received_dataset = dcmread(received, defer_size=DEFER_SIZE)
             
-            # Create our query dataset at the INSTANCE level
-            ds = Dataset()
-            ds.QueryRetrieveLevel = 'IMAGE'  # IMAGE level for instance retrieval
-            ds.StudyInstanceUID = study_instance_uid
-            ds.SeriesInstanceUID = series_instance_uid
-            ds.SOPInstanceUID = sop_instance_uid
+            # extract_dicom_metadata only keeps the all_attributes part of
+            # extract_full_metadata, so build just that one
+            all_attributes = DicomMetadataHandler(received_dataset).extract_all_attributes()
+            # The identifiers are known from the request, no dataset access
+            # needed. Added to a copy, the handler keeps the dict it memoized
+            processed_metadata = dict(all_attributes)
+            processed_metadata.setdefault('StudyInstanceUID', study_instance_uid)
+            processed_metadata.setdefault('SeriesInstanceUID', series_instance_uid)
+            processed_metadata.setdefault('SOPInstanceUID', sop_instance_uid)
+            return DicomResult(
+                success=True,
+                message=f"Retrieved instance {sop_instance_uid}",
+                data=processed_metadata,
+                status_code=200
+            )
             
-            # Store received dataset
-            received_dataset = None
+        except Exception as e:
+            logger.error("Exception in get_instance_with_pixels: %s", e)
+            return DicomResult(
+                success=False,
+                message=f"Exception in get_instance_with_pixels: {str(e)}",
+                status_code=500
+            )
+        finally:
+            spool.cleanup()
+
+    def _get_instances(
+        self,
+        study_instance_uid: str,
+        series_instance_uid: str,
+        sop_instance_uids: Optional[List[str]],
+    ) -> DicomResult:
+        """Blocking body of get_instances_with_pixels."""
+        ds = Dataset()
+        ds.QueryRetrieveLevel = 'SERIES'
+        ds.StudyInstanceUID = study_instance_uid
+        ds.SeriesInstanceUID = series_instance_uid
+        
+        # No filter when the whole series is requested
+        wanted = frozenset(sop_instance_uids) if sop_instance_uids else None
+        instances: Dict[str, Any] = {}
+        failures: List[str] = []
+        
+        # As in get_study_with_pixels, spooled paths go through a bounded queue
+        # to a consumer thread, so metadata extraction overlaps with the
+        # transfer and a slow consumer back-pressures the SCP
+        received = queue.Queue(maxsize=_RECEIVE_QUEUE_SIZE)
+        
+        with tempfile.TemporaryDirectory(prefix="cget-") as spool_dir:
+            def extract_instances():
+                """Extract the metadata of queued instances until the sentinel arrives."""
+                while True:
+                    item = received.get()
+                    if item is _SENTINEL:
+                        break
+                    sop_instance_uid, path = item
+                    try:
+                        # Large elements are only read from the spool file when accessed
+                        instances[sop_instance_uid] = DicomMetadataHandler(
+                            dcmread(path, defer_size=DEFER_SIZE)
+                        ).extract_all_attributes()
+                    except Exception as e:
+                        # Keep draining, a dead consumer would block handle_store
+                        logger.warning("Error extracting metadata of %s: %s", sop_instance_uid, e)
+                        failures.append(sop_instance_uid)
+                    else:
+                        self._cache_instance(sop_instance_uid, path)
+                    finally:
+                        os.remove(path)
             
-            # Implement handler for C-STORE operations triggered by C-GET
             def handle_store(event):
-                """Handle a C-STORE request event."""
-                nonlocal received_dataset
-                dataset = event.dataset
-                
-                # Add file meta information
-                if event.file_meta:
-                    dataset.file_meta = event.file_meta
-                
-                # Store the dataset
-                received_dataset = dataset
-                
-                logger.info(f"Received instance: {dataset.SOPInstanceUID if hasattr(dataset, 'SOPInstanceUID') else 'Unknown'}")
-                
-                # Return success status
+                """Spool the requested instances, acknowledging the others without writing them."""
+                sop_instance_uid = event.request.AffectedSOPInstanceUID
+                if wanted is None or sop_instance_uid in wanted:
+                    path = os.path.join(spool_dir, f"{sop_instance_uid}.dcm")
+                    _spool_dataset(event, path)
+                    # Blocks while the queue is full
+                    received.put((sop_instance_uid, path))
                 return 0x0000
             
-            # Associate with the peer AE
-            assoc = ae.associate(
-                self.server_ip,
-                self.server_port,
-                ae_title=self.server_ae_title,
-                ext_neg=roles,
-                evt_handlers=[(evt.EVT_C_STORE, handle_store)]
-            )
-            
-            if assoc.is_established:
-                try:
-                    logger.info(f"Association established for C-GET of instance {sop_instance_uid}")
-                    
-                    # Send the C-GET request
-                    responses = assoc.send_c_get(
-                        ds, 
-                        StudyRootQueryRetrieveInformationModelGet
-                    )
-                    
-                    # Process the responses
-                    completed = False
-                    
-                    for status, identifier in responses:
-                        if status:
-                            status_code = status.Status
-                            logger.info(f"C-GET status: 0x{status_code:04X}")
-                            
-                            category = code_to_category(status_code)
-                            
-                            if status_code == 0x0000:  # Success
-                                completed = True
-                                logger.info(f"C-GET completed successfully")
-                            
-                            elif category in ['Cancel', 'Failure', 'Warning']:
-                                logger.warning(f"C-GET issue: {category} - Status: 0x{status_code:04X}")
-                        else:
-                            logger.error("Connection timed out, was aborted or received invalid response")
-                    
-                    # Release the association
-                    assoc.release()
-                    
-                    # Check if we received the dataset
-                    if not received_dataset:
-                        return DicomResult(
-                            success=False,
-                            message=f"Instance with UID {sop_instance_uid} not found or could not be retrieved",
-                            status_code=404
-                        )
-                    
-                    # Process the received dataset
-                    result_dict = {}
-                    
-                    # Add key identifiers
-                    if hasattr(received_dataset, 'SOPInstanceUID'):
-                        result_dict['SOPInstanceUID'] = str(received_dataset.SOPInstanceUID)
-                    if hasattr(received_dataset, 'SeriesInstanceUID'):
-                        result_dict['SeriesInstanceUID'] = str(received_dataset.SeriesInstanceUID)
-                    if hasattr(received_dataset, 'StudyInstanceUID'):
-                        result_dict['StudyInstanceUID'] = str(received_dataset.StudyInstanceUID)
-                    
-                    dicomHandle = DicomMetadataHandler(received_dataset)
-                    extractor = dicomHandle.extract_full_metadata()
-                    processed_metadata = dicomHandle.extract_dicom_metadata(extractor)
+            storage_classes = self._study_storage_classes(study_instance_uid)
+            with self._retrieval(handle_store, storage_classes) as assoc:
+                if assoc is None:
                     return DicomResult(
-                        success=True,
-                        message=f"Retrieved instance {sop_instance_uid}",
-                        data=processed_metadata,
-                        status_code=200
+                        success=False,
+                        message=f"Failed to establish association for C-GET with {self.server_ip}:{self.server_port}",
+                        status_code=500
                     )
-                    
-                except Exception as e:
-                    logger.error(f"Error during C-GET: {str(e)}")
-                    if assoc.is_established:
-                        assoc.abort()
+                
+                worker = threading.Thread(target=extract_instances, daemon=True)
+                worker.start()
+                try:
+                    logger.info("Sending C-GET of series %s", series_instance_uid)
+                    self._send_c_get(assoc, ds, StudyRootQueryRetrieveInformationModelGet)
+                except (RuntimeError, ValueError, OSError) as e:
+                    logger.error("Error during C-GET: %s", e)
+                    _end_association(assoc, e)
                     return DicomResult(
                         success=False,
                         message=f"Error during C-GET: {str(e)}",
                         status_code=500
                     )
-            else:
-                logger.error(f"Failed to establish association for C-GET with {self.server_ip}:{self.server_port}")
+                except BaseException:
+                    # As in get_study_with_pixels, the pooled association
+                    # must not be reused with responses pending
+                    assoc.abort()
+                    raise
+                finally:
+                    # Wait for the consumer to drain the remaining instances
+                    received.put(_SENTINEL)
+                    worker.join()
+        
+        if not instances and not failures:
+            return DicomResult(
+                success=False,
+                message=f"No instances of series {series_instance_uid} found or could be retrieved",
+                status_code=404
+            )
+        
+        missing = [uid for uid in wanted if uid not in instances and uid not in failures] if wanted is not None else []
+        return DicomResult(
+            success=True,
+            message=f"Retrieved {len(instances)} instances of series {series_instance_uid}",
+            data={"instances": instances, "missing": missing, "failed": failures},
+            status_code=200
+        )
+
+    def _get_instance_file(self, study_instance_uid: str, series_instance_uid: str, sop_instance_uid: str) -> DicomResult:
+        """Blocking body of get_instance_pixels."""
+        with tempfile.TemporaryDirectory(prefix="cget-") as spool_dir:
+            received = self._retrieve_instance(study_instance_uid, series_instance_uid, sop_instance_uid, spool_dir)
+            if isinstance(received, DicomResult):
+                return received
+            with open(received, 'rb') as f:
+                content = f.read()
+        return DicomResult(
+            success=True,
+            message=f"Retrieved instance {sop_instance_uid}",
+            data=content,
+            status_code=200
+        )
+
+    def _retrieve_instance(
+        self,
+        study_instance_uid: str,
+        series_instance_uid: str,
+        sop_instance_uid: str,
+        spool_dir: str,
+    ) -> Union[str, DicomResult]:
+        """C-GET one instance into spool_dir, returning its path or the failure result.
+
+        Instances retrieved before are linked from the instance cache instead.
+        """
+        cached_path = os.path.join(spool_dir, "cached.dcm")
+        if self._link_cached_instance(sop_instance_uid, cached_path):
+            logger.debug("Instance %s served from the cache", sop_instance_uid)
+            return cached_path
+        
+        # Create our query dataset at the INSTANCE level
+        ds = Dataset()
+        ds.QueryRetrieveLevel = 'IMAGE'  # IMAGE level for instance retrieval
+        ds.StudyInstanceUID = study_instance_uid
+        ds.SeriesInstanceUID = series_instance_uid
+        ds.SOPInstanceUID = sop_instance_uid
+        
+        # The received instance is written to disk as is, not decoded. The
+        # handler runs on pynetdicom's reactor thread and only appends, which
+        # is atomic, to a list read back once the C-GET has completed
+        received_paths: List[str] = []
+        
+        # Implement handler for C-STORE operations triggered by C-GET
+        def handle_store(event):
+            """Handle a C-STORE request event."""
+            path = os.path.join(spool_dir, f"{len(received_paths)}.dcm")
+            _spool_dataset(event, path)
+            received_paths.append(path)
+            
+            logger.info("Received instance: %s", event.request.AffectedSOPInstanceUID)
+            
+            # Return success status
+            return 0x0000
+        
+        # A single instance is not worth a C-FIND, but a study retrieved
+        # earlier tells which storage classes to negotiate
+        storage_classes = self._study_storage_classes(study_instance_uid, discover=False)
+        with self._retrieval(handle_store, storage_classes) as assoc:
+            if assoc is None:
                 return DicomResult(
                     success=False,
                     message=f"Failed to establish association for C-GET with {self.server_ip}:{self.server_port}",
                     status_code=500
                 )
-                
-        except Exception as e:
-            logger.error(f"Exception in get_instance_with_pixels: {str(e)}")
+            
+            try:
+                logger.info("Sending C-GET of instance %s", sop_instance_uid)
+                self._send_c_get(assoc, ds, StudyRootQueryRetrieveInformationModelGet)
+            except (RuntimeError, ValueError, OSError) as e:
+                logger.error("Error during C-GET: %s", e)
+                _end_association(assoc, e)
+                return DicomResult(
+                    success=False,
+                    message=f"Error during C-GET: {str(e)}",
+                    status_code=500
+                )
+            except BaseException:
+                assoc.abort()
+                raise
+        
+        # Check if we received the dataset
+        if not received_paths:
             return DicomResult(
                 success=False,
-                message=f"Exception in get_instance_with_pixels: {str(e)}",
-                status_code=500
+                message=f"Instance with UID {sop_instance_uid} not found or could not be retrieved",
+                status_code=404
             )
+        self._cache_instance(sop_instance_uid, received_paths[0])
+        return received_paths[0]
@@ -1,20 +1,347 @@
 import pydicom
-from typing import Dict, Any, Optional, Union, List
+from pydicom.datadict import dictionary_VR, keyword_for_tag
+from pydicom.dataelem import DataElement, RawDataElement
+from pydicom.dataset import Dataset
+from pydicom.multival import MultiValue
+from pydicom.tag import BaseTag, Tag
+from typing import Callable, Dict, Any, Final, FrozenSet, Iterable, Iterator, NamedTuple, Optional, Tuple, Union, List
+from functools import lru_cache
 from io import BytesIO
+from operator import attrgetter
+from types import MappingProxyType
 import logging
 
 logger = logging.getLogger(__name__)
 
+PIXEL_DATA_TAG: Final = 0x7FE00010
+# Sequence of Ultrasound Regions and its items' Physical Delta X/Y (in cm)
+ULTRASOUND_REGIONS_TAG: Final = 0x00186011
+_PHYSICAL_DELTA_X_TAG: Final = 0x0018602C
+_PHYSICAL_DELTA_Y_TAG: Final = 0x0018602E
+
+# Converted to strings
+_STR_VRS: Final[FrozenSet[str]] = frozenset({'PN', 'DA', 'TM', 'DT', 'LO', 'SH', 'CS', 'UI', 'IS', 'DS', 'AS'})
+# Only their size is reported
+_BIN_VRS: Final[FrozenSet[str]] = frozenset({'OB', 'OW', 'OF', 'OD', 'UN'})
+
+def _as_raw(elem: Union[DataElement, "_NumericText"]) -> Any:
+    # Plain primitives, which orjson encodes without a default= callback
+    # (numbers, including pydicom's int/float subclasses, are kept as is)
+    value = elem.value
+    if isinstance(value, MultiValue):
+        return list(value)
+    if isinstance(value, bytes):
+        return f"{elem.VR} data ({len(value)} bytes)"
+    return value
+
+def _as_str(elem: Union[DataElement, "_NumericText"]) -> Union[str, List[str]]:
+    # A multi-valued element (ImageType, PixelSpacing) becomes a list of strings
+    value = elem.value
+    if isinstance(value, (MultiValue, list)):
+        return [str(item) for item in value]
+    return str(value)
+
+def _as_bin(elem: DataElement) -> str:
+    return f"{elem.VR} data ({len(elem.value)} bytes)"
+
+def _as_seq(elem: DataElement) -> List[Dict[str, Any]]:
+    # For sequences, extract each item as a dictionary, at any depth
+    return [_convert_elements(item, _VR_HANDLERS, "Error") for item in elem.value]
+
+# VR -> conversion, looked up once per element. Sequence items are converted
+# with the same rules
+_VR_HANDLERS: Final[Dict[str, Callable[[Any], Any]]] = {
+    **dict.fromkeys(_STR_VRS, _as_str),
+    **dict.fromkeys(_BIN_VRS, _as_bin),
+    'SQ': _as_seq,
+}
+_FILE_META_VR_HANDLERS: Final[Dict[str, Callable[[Any], Any]]] = {
+    **dict.fromkeys(_STR_VRS, _as_str),
+    **dict.fromkeys(_BIN_VRS, _as_bin),
+}
+
+_ROWS_TAG: Final = 0x00280010
+_COLUMNS_TAG: Final = 0x00280011
+# (name, tag, conversion) of the other pixel data information, in output order
+_PIXEL_INFO_TAGS: Final[Tuple[Tuple[str, int, Callable[[Any], Any]], ...]] = (
+    ('NumberOfFrames', 0x00280008, int),
+    ('PixelSpacing', 0x00280030, lambda value: [float(x) for x in value]),
+    ('BitsAllocated', 0x00280100, int),
+    ('BitsStored', 0x00280101, int),
+    ('PhotometricInterpretation', 0x00280004, str),
+    ('SamplesPerPixel', 0x00280002, int),
+)
+
+def _physical_deltas(region: Dataset) -> Tuple[float, float]:
+    """Physical deltas of an ultrasound region, in mm."""
+    return (
+        round(float(region[_PHYSICAL_DELTA_X_TAG].value) * 10, 5),
+        round(float(region[_PHYSICAL_DELTA_Y_TAG].value) * 10, 5),
+    )
+
+def _pixel_data_length(dataset: Dataset) -> int:
+    """Length of the Pixel Data, read from the raw element when possible.
+
+    A deferred or not yet converted element still has its encoded length, so
+    the pixel data itself is not read. Encapsulated pixel data has an undefined
+    length and is only measured from its value.
+    """
+    length = getattr(dataset.get_item(PIXEL_DATA_TAG), 'length', None)
+    if length is None or length == 0xFFFFFFFF:
+        return len(dataset.PixelData)
+    return int(length)
+
+# Dictionary VR of the (few distinct) tags read in implicit VR
+_dictionary_vr = lru_cache(maxsize=1024)(dictionary_VR)
+
+# Decimal/integer strings, converted by pydicom into one DSfloat/IS per value
+_NUMERIC_STRING_VRS: Final[FrozenSet[str]] = frozenset({'DS', 'IS'})
+
+def _raw_numeric_strings(dataset: Dataset, tag: Union[str, int]) -> Optional[Tuple[str, List[str]]]:
+    """VR and values of a DS/IS element that pydicom has not converted yet, read from its encoded text.
+
+    Returns None whenever the element is not in that raw state, the caller then
+    goes through the converted value.
+    """
+    raw = dataset.get_item(tag)
+    if not isinstance(raw, RawDataElement) or raw.value is None:
+        return None
+    vr = raw.VR
+    if vr is None:
+        # Implicit VR
+        try:
+            vr = _dictionary_vr(raw.tag)
+        except KeyError:
+            return None
+    if vr not in _NUMERIC_STRING_VRS:
+        return None
+    try:
+        text = raw.value.decode('ascii')
+    except (AttributeError, UnicodeDecodeError):
+        return None
+    # As pydicom's MultiString, without the trailing padding
+    return vr, [part.strip() for part in text.rstrip(' \x00').split('\\')]
+
+class _NumericText(NamedTuple):
+    """Stand-in for an unconverted DS/IS element, holding its text (a list of texts if multi-valued)."""
+    keyword: str
+    VR: str
+    value: Union[str, List[str]]
+
+def _convert_elements(elements: Iterable, handlers: Dict[str, Callable[[Any], Any]], error_prefix: str) -> Dict[str, Any]:
+    """Convert the elements (a dataset or any iterable of data elements) that have a keyword, keyed by keyword."""
+    result: Dict[str, Any] = {}
+    for elem in elements:
+        keyword = elem.keyword
+        if not keyword:  # Skip elements without keywords
+            continue
+        # Empty elements are checked here rather than failing in a handler
+        if elem.value is None:
+            result[keyword] = None
+            continue
+        try:
+            result[keyword] = handlers.get(elem.VR, _as_raw)(elem)
+        except Exception as e:
+            result[keyword] = f"{error_prefix}: {str(e)}"
+    return result
+
+@lru_cache(maxsize=4096)
+def _as_tag(tag: Union[str, tuple, int]) -> BaseTag:
+    """Tag from a hex string ('00100010'), a (group, element) tuple or an int."""
+    if isinstance(tag, str):
+        return Tag(int(tag[:4], 16), int(tag[4:], 16))
+    return Tag(tag)
+
+# VR of the tags commonly added, other tags get one inferred from the value
+_VR_MAPPINGS: Final[Dict[int, str]] = {
+    # Patient Information Tags
+    0x00100010: 'PN',  # Patient Name
+    0x00100020: 'LO',  # Patient ID
+    0x00100030: 'DA',  # Patient Birth Date
+    0x00100040: 'CS',  # Patient Sex
+    0x00100021: 'LO',  # Issuer of Patient ID
+
+    # Contact and Demographic Tags
+    0x00101040: 'LO',  # Patient Address
+    0x00102154: 'SH',  # Patient Telephone Numbers
+    0x00100050: 'SQ',  # Patient's Insurance Plan Code
+
+    # Study Information Tags
+    0x0020000D: 'UI',  # Study Instance UID
+    0x00080020: 'DA',  # Study Date
+    0x00080030: 'TM',  # Study Time
+
+    # Institution Tags
+    0x00080080: 'LO',  # Institution Name
+    0x00081040: 'LO',  # Institutional Department Name
+}
+
+# Category -> key -> tag of the metadata extracted by tag, read-only at both levels
+_TAG_MAPPINGS = MappingProxyType({
+    'patient_info': MappingProxyType({
+        'PatientName': '00100010',
+        'PatientID': '00100020',
+        'PatientBirthDate': '00100030',
+        'PatientSex': '00100040',
+        'PatientAge': '00101010',
+        'PatientWeight': '00101030',
+        'IssuerOfPatientID': '00100021'
+    }),
+    'study_info': MappingProxyType({
+        'StudyInstanceUID': '0020000D',
+        'StudyDate': '00080020',
+        'StudyTime': '00080030',
+        'StudyDescription': '00081030',
+        'StudyID': '00200010',
+        'AccessionNumber': '00080050',
+        'ReferringPhysicianName': '00080090',
+        'PerformingPhysicianName': '00081050',
+        'InstitutionName': '00080080',
+        'InstitutionAddress': '00080081'
+    }),
+    'series_info': MappingProxyType({
+        'SeriesInstanceUID': '0020000E',
+        'SeriesNumber': '00200011',
+        'Modality': '00080060',
+        'SeriesDescription': '0008103E',
+        'AcquisitionDate': '00080022',
+        'AcquisitionTime': '00080032',
+        'AcquisitionNumber': '00200012',
+        'AcquisitionProtocolName': '00181030'
+    }),
+    'image_info': MappingProxyType({
+        'SOPInstanceUID': '00080018',
+        'SOPClassUID': '00080016',
+        'ImageType': '00080008',
+        'InstanceCreationDate': '00080012',
+        'InstanceCreationTime': '00080013'
+    }),
+    'transfer_syntax': MappingProxyType({
+        'TransferSyntaxUID': '00020010',
+        'ReferencedTransferSyntaxUI': '00041512',
+        'MACCalculationTransferSyntaxUID': '04000010',
+        'EncryptedContentTransferSyntaxUID': '04000500'
+    }),
+    'geometry': MappingProxyType({
+        'PixelSpacing': '00280030',
+        'Height': '00280010',
+        'Width': '00280011',
+        'NumberOfFrames': '00280008',
+        'SliceThickness': '00180050',
+        'PhotometricInterpretation': '00280004',
+        'PhysicalDeltaX': '0018602c',
+        'PhysicalDeltaY': '0018602e'
+    }),
+    'device_info': MappingProxyType({
+        'Manufacturer': '00080070',
+        'ManufacturerModelName': '00080080',
+        'DeviceSerialNumber': '00181000'
+    }),
+    'protocol_info': MappingProxyType({
+        'ProtocolName': '00181030',
+        'ContrastBolusAgent': '00180010'
+    }),
+    'pixel_data': MappingProxyType({
+        'BitsAllocated': '00280100',
+        'BitsStored': '00280101',
+        'HighBit': '00280102',
+        'PixelRepresentation': '00280103'
+    })
+})
+
+# The same, flattened with the tags parsed, in extraction order
+_TAG_INDEX: Final[Tuple[Tuple[str, str, int], ...]] = tuple(
+    (category, key, int(tag, 16))
+    for category, category_tags in _TAG_MAPPINGS.items()
+    for key, tag in category_tags.items()
+)
+
+# (keyword, tag) of the file meta UIDs extracted
+_FILE_META_UID_TAGS: Final[Tuple[Tuple[str, int], ...]] = (
+    ('MediaStorageSOPClassUID', 0x00020002),
+    ('MediaStorageSOPInstanceUID', 0x00020003),
+    ('TransferSyntaxUID', 0x00020010),
+    ('ImplementationClassUID', 0x00020012),
+)
+
+# Category -> attributes of the metadata extracted by attribute
+_ATTRIBUTE_MAPPINGS = MappingProxyType({
+    'patient_info': (
+        'PatientName', 'PatientID', 'PatientBirthDate',
+        'PatientSex', 'PatientAge', 'PatientWeight'
+    ),
+    'study_info': (
+        'StudyInstanceUID', 'StudyDate', 'StudyTime',
+        'StudyDescription', 'StudyID'
+    ),
+    'series_info': (
+        'SeriesInstanceUID', 'SeriesNumber',
+        'Modality', 'SeriesDescription'
+    ),
+    'instance_info': (
+        'SOPInstanceUID', 'SOPClassUID', 'ImageType',
+        'InstanceCreationDate', 'InstanceCreationTime'
+    ),
+    'geometry': (
+        'PixelSpacing', 'Height', 'Width', 'NumberOfFrames',
+        'SliceThickness', 'PhotometricInterpretation',
+        'PhysicalDeltaX', 'PhysicalDeltaY'
+    ),
+    'device_info': (
+        'Manufacturer', 'ManufacturerModelName', 'DeviceSerialNumber'
+    ),
+    'pixel_data': (
+        'BitsAllocated', 'BitsStored', 'HighBit', 'PixelRepresentation'
+    )
+})
+
+# One getter per category, returning the values of all its attributes as a
+# tuple (every category has several)
+_ATTRIBUTE_GETTERS = {
+    category: attrgetter(*attributes)
+    for category, attributes in _ATTRIBUTE_MAPPINGS.items()
+}
+
+def _get_attribute(dataset: Dataset, attr: str) -> Any:
+    try:
+        return getattr(dataset, attr, '')
+    except Exception:
+        return ''
+
+def _attribute_str(value: Any) -> str:
+    return str(value) if value else ''
+
 class DicomMetadataHandler:
-    def __init__(self, dicom_data):
+    # One handler per received instance
+    __slots__ = ('dicom', 'metadata')
+
+    def __init__(self, dicom_data: Dataset) -> None:
         """Initialize the extractor with a DICOM file.
 
         Args:
-            dicom_file: File-like object containing DICOM data
+            dicom_data: Dataset read from a DICOM file
         """
-        self.dicom = dicom_data
+        self.dicom: Dataset = dicom_data
+        # Extraction results, cleared whenever a tag is updated or added
+        # through this handler
         self.metadata: Dict[str, Any] = {}
 
+    def _converted_elements(self) -> Iterator[Any]:
+        """Elements of the dataset in tag order, without Pixel Data.
+
+        DS/IS elements not converted yet are read as text instead, and stay
+        unconverted in the dataset.
+        """
+        for tag in sorted(self.dicom.keys()):
+            if tag == PIXEL_DATA_TAG:
+                continue
+            raw_numeric = _raw_numeric_strings(self.dicom, tag)
+            if raw_numeric is None:
+                yield self.dicom[tag]
+            else:
+                vr, values = raw_numeric
+                yield _NumericText(keyword_for_tag(tag), vr, values[0] if len(values) == 1 else values)
+
     def extract_all_attributes(self) -> Dict[str, Any]:
         """
         Extract all attributes from the DICOM dataset.
@@ -22,144 +349,65 @@ class DicomMetadataHandler:
         Returns:
             Dictionary containing all DICOM attributes with their values
         """
-        result = {}
-        
-        # Process all elements in the dataset
-        for elem in self.dicom:
-            if elem.keyword:  # Skip elements without keywords
-                try:
-                    # Handle different VR types appropriately
-                    if elem.VR in ['PN', 'DA', 'TM', 'DT', 'LO', 'SH', 'CS', 'UI', 'IS', 'DS', 'AS']:
-                        # Convert these types to strings
-                        result[elem.keyword] = str(elem.value) if elem.value is not None else None
-                    elif elem.VR == 'SQ':
-                        # For sequences, extract each item as a dictionary
-                        if elem.value is not None:
-                            seq_items = []
-                            for item in elem.value:
-                                item_dict = {}
-                                for subelem in item:
-                                    if subelem.keyword:
-                                        try:
-                                            if subelem.VR in ['PN', 'DA', 'TM', 'DT', 'LO', 'SH', 'CS', 'UI', 'IS', 'DS', 'AS']:
-                                                item_dict[subelem.keyword] = str(subelem.value) if subelem.value is not None else None
-                                            elif subelem.VR == 'SQ':
-                                                item_dict[subelem.keyword] = "Nested sequence"
-                                            elif subelem.VR in ['OB', 'OW', 'OF', 'OD', 'UN']:
-                                                item_dict[subelem.keyword] = f"{subelem.VR} data ({len(subelem.value)} bytes)"
-                                            else:
-                                                item_dict[subelem.keyword] = subelem.value
-                                        except Exception as e:
-                                            item_dict[subelem.keyword] = f"Error: {str(e)}"
-                                seq_items.append(item_dict)
-                            result[elem.keyword] = seq_items
-                        else:
-                            result[elem.keyword] = None
-                    elif elem.VR in ['OB', 'OW', 'OF', 'OD', 'UN']:
-                        # For binary data, just note its presence and size
-                        if elem.keyword == 'PixelData':
-                            result[elem.keyword] = f"PixelData present ({len(elem.value)} bytes)"
-                        else:
-                            result[elem.keyword] = f"{elem.VR} data ({len(elem.value)} bytes)"
-                    else:
-                        # For other types, use the value directly
-                        result[elem.keyword] = elem.value
-                except Exception as e:
-                    result[elem.keyword] = f"Error extracting value: {str(e)}"
+        cached: Optional[Dict[str, Any]] = self.metadata.get('all_attributes')
+        if cached is not None:
+            return cached
+
+        # Process all elements in the dataset. Getting Pixel Data from the
+        # dataset would read it in full, only its length is reported
+        result = _convert_elements(self._converted_elements(), _VR_HANDLERS, "Error extracting value")
+        if PIXEL_DATA_TAG in self.dicom:
+            try:
+                result['PixelData'] = f"PixelData present ({_pixel_data_length(self.dicom)} bytes)"
+            except Exception as e:
+                result['PixelData'] = f"Error extracting value: {str(e)}"
         
         # Add file meta information if available
         if hasattr(self.dicom, 'file_meta'):
-            file_meta = {}
-            for elem in self.dicom.file_meta:
-                if elem.keyword:
-                    try:
-                        if elem.VR in ['PN', 'DA', 'TM', 'DT', 'LO', 'SH', 'CS', 'UI', 'IS', 'DS', 'AS']:
-                            file_meta[elem.keyword] = str(elem.value) if elem.value is not None else None
-                        elif elem.VR in ['OB', 'OW', 'OF', 'OD', 'UN']:
-                            file_meta[elem.keyword] = f"{elem.VR} data ({len(elem.value)} bytes)"
-                        else:
-                            file_meta[elem.keyword] = elem.value
-                    except Exception as e:
-                        file_meta[elem.keyword] = f"Error extracting value: {str(e)}"
-            result['FileMetaInformation'] = file_meta
+            result['FileMetaInformation'] = _convert_elements(
+                self.dicom.file_meta, _FILE_META_VR_HANDLERS, "Error extracting value"
+            )
         
         # Add pixel data information
-        if 'PixelData' in self.dicom:
-            pixel_info = {}
+        if PIXEL_DATA_TAG in self.dicom:
+            pixel_info: Dict[str, Any] = {}
             
             # Add image dimensions if available
-            if hasattr(self.dicom, 'Rows') and hasattr(self.dicom, 'Columns'):
-                pixel_info['Dimensions'] = f"{self.dicom.Rows}x{self.dicom.Columns}"
-                pixel_info['Rows'] = int(self.dicom.Rows)
-                pixel_info['Columns'] = int(self.dicom.Columns)
-            
-            # Add number of frames if available
-            if hasattr(self.dicom, 'NumberOfFrames'):
-                pixel_info['NumberOfFrames'] = int(self.dicom.NumberOfFrames)
+            rows = self.dicom.get(_ROWS_TAG)
+            columns = self.dicom.get(_COLUMNS_TAG)
+            if rows is not None and columns is not None:
+                pixel_info['Dimensions'] = f"{rows.value}x{columns.value}"
+                pixel_info['Rows'] = int(rows.value)
+                pixel_info['Columns'] = int(columns.value)
             
-            # Add pixel spacing if available
-            if hasattr(self.dicom, 'PixelSpacing'):
+            # Add frames, spacing, bits and color information if available
+            for name, tag, convert in _PIXEL_INFO_TAGS:
+                elem = self.dicom.get(tag)
+                if elem is None:
+                    continue
                 try:
-                    pixel_info['PixelSpacing'] = [float(x) for x in self.dicom.PixelSpacing]
+                    pixel_info[name] = convert(elem.value)
                 except Exception as e:
-                    pixel_info['PixelSpacing'] = f"Error converting: {str(e)}"
-            
-            # Add bits allocated/stored if available
-            if hasattr(self.dicom, 'BitsAllocated'):
-                pixel_info['BitsAllocated'] = int(self.dicom.BitsAllocated)
-            if hasattr(self.dicom, 'BitsStored'):
-                pixel_info['BitsStored'] = int(self.dicom.BitsStored)
-            
-            # Add photometric interpretation if available
-            if hasattr(self.dicom, 'PhotometricInterpretation'):
-                pixel_info['PhotometricInterpretation'] = str(self.dicom.PhotometricInterpretation)
-            
-            # Add samples per pixel if available
-            if hasattr(self.dicom, 'SamplesPerPixel'):
-                pixel_info['SamplesPerPixel'] = int(self.dicom.SamplesPerPixel)
+                    pixel_info[name] = f"Error converting: {str(e)}"
             
             result['PixelDataInfo'] = pixel_info
         
+        self.metadata['all_attributes'] = result
         return result
 
     @staticmethod
-    def _determine_vr(tag: Union[str, pydicom.tag.Tag], value: Any) -> str:
+    def _determine_vr(tag: Union[str, BaseTag], value: Any) -> str:
         """Determine the appropriate Value Representation (VR) for a given tag.
 
         :param tag: DICOM tag
         :param value: Value to be set
         :return: Appropriate VR for the tag
         """
-        # Define VR mappings for common tag types
-        vr_mappings = {
-            # Patient Information Tags
-            '00100010': 'PN',  # Patient Name
-            '00100020': 'LO',  # Patient ID
-            '00100030': 'DA',  # Patient Birth Date
-            '00100040': 'CS',  # Patient Sex
-            # '00100050': 'LO',  # Patient Insurance Plan Code
-            '00100021': 'LO',  # Issuer of Patient ID
-
-            # Contact and Demographic Tags
-            '00101040': 'LO',  # Patient Address
-            '00102154': 'SH',  # Patient Telephone Numbers
-            '00100050': 'SQ',  # Patient's Insurance Plan Code
-
-            # Study Information Tags
-            '0020000D': 'UI',  # Study Instance UID
-            '00080020': 'DA',  # Study Date
-            '00080030': 'TM',  # Study Time
-
-            # Institution Tags
-            '00080080': 'LO',  # Institution Name
-            '00081040': 'LO',  # Institutional Department Name
-        }
-
-        # Convert tag to string if it's a pydicom Tag
-        tag_str = str(tag) if isinstance(tag, pydicom.tag.Tag) else tag
-
         # Lookup specific VR, fallback to type inference
-        vr = vr_mappings.get(tag_str)
+        try:
+            vr = _VR_MAPPINGS.get(Tag(tag))
+        except (TypeError, ValueError, OverflowError):
+            vr = None
 
         if vr:
             return vr
@@ -178,7 +426,7 @@ class DicomMetadataHandler:
 
     def update_dicom_tag(
         self,
-        tag: Union[str, tuple, pydicom.tag.Tag],
+        tag: Union[str, tuple, BaseTag],
         value: Any,
         add_if_not_exists: bool = True
     ) -> bool:
@@ -189,32 +437,30 @@ class DicomMetadataHandler:
         :param add_if_not_exists: Whether to add tag if not found
         :return: Boolean indicating successful update/addition
         """
+        self.metadata.clear()
         try:
             # Normalize tag representation
-            if isinstance(tag, str):
-                # Convert hex string to tuple if needed
-                tag = (int(tag[:4], 16), int(tag[4:], 16))
+            tag = _as_tag(tag)
 
-            # Attempt to update existing tag
-            try:
+            # Update existing tag
+            if tag in self.dicom:
                 self.dicom[tag].value = value
                 return True
-            except KeyError:
-                # Tag not found
-                if not add_if_not_exists:
-                    logger.warning(f"Tag {tag} not found and add_if_not_exists is False")
-                    return False
 
-                # Determine appropriate VR
-                vr = self._determine_vr(tag, value)
+            if not add_if_not_exists:
+                logger.warning(f"Tag {tag} not found and add_if_not_exists is False")
+                return False
 
-                try:
-                    # Add new tag with inferred VR
-                    self.dicom.add_new(tag, vr, value)
-                    return True
-                except Exception as add_error:
-                    logger.error(f"Could not add tag {tag}: {add_error}")
-                    return False
+            # Determine appropriate VR
+            vr = self._determine_vr(tag, value)
+
+            try:
+                # Add new tag with inferred VR
+                self.dicom.add_new(tag, vr, value)
+                return True
+            except Exception as add_error:
+                logger.error(f"Could not add tag {tag}: {add_error}")
+                return False
 
         except Exception as e:
             logger.error(f"Error updating DICOM tag {tag}: {e}")
@@ -229,15 +475,46 @@ class DicomMetadataHandler:
         :param tag_updates: Dictionary of tags to update {tag: value}
         :return: List of successfully updated tags
         """
-        successful_tags = []
-        for tag, value in tag_updates.items():
-            if self.update_dicom_tag(tag, value):
-                successful_tags.append(tag)
-        return successful_tags
+        self.metadata.clear()
+
+        # Normalize all tags first and split them into updates and additions,
+        # keeping each update's position to return the tags in the given order
+        updates_existing: List[Tuple[int, BaseTag, Any]] = []
+        updates_new: List[Tuple[int, BaseTag, Any]] = []
+        failures: List[Tuple[Any, Exception]] = []
+        for index, (raw_tag, value) in enumerate(tag_updates.items()):
+            try:
+                tag = _as_tag(raw_tag)
+            except Exception as e:
+                failures.append((raw_tag, e))
+                continue
+            (updates_existing if tag in self.dicom else updates_new).append((index, tag, value))
+
+        updated = []
+        for index, tag, value in updates_existing:
+            try:
+                self.dicom[tag].value = value
+            except Exception as e:
+                failures.append((tag, e))
+                continue
+            updated.append(index)
+        for index, tag, value in updates_new:
+            try:
+                self.dicom.add_new(tag, self._determine_vr(tag, value), value)
+            except Exception as e:
+                failures.append((tag, e))
+                continue
+            updated.append(index)
+
+        if failures:
+            logger.error(f"Could not update {len(failures)} DICOM tags: " + "; ".join(f"{tag}: {e}" for tag, e in failures))
+
+        requested_tags = list(tag_updates)
+        return [requested_tags[index] for index in sorted(updated)]
 
     def add_dicom_tag_if_missing(
     self,
-    tag: Union[str, tuple, pydicom.tag.Tag],
+    tag: Union[str, tuple, BaseTag],
     value: Any
     ) -> bool:
         """Explicitly add a DICOM tag if it does not exist.
@@ -248,11 +525,11 @@ class DicomMetadataHandler:
         """
         try:
             # Normalize tag representation
-            if isinstance(tag, str):
-                tag = (int(tag[:4], 16), int(tag[4:], 16))  # Convert hex string to tuple
+            tag = _as_tag(tag)
 
             # Check if tag exists
             if tag not in self.dicom:
+                self.metadata.clear()
                 # Determine appropriate VR
                 vr = self._determine_vr(tag, value)
 
@@ -270,6 +547,10 @@ class DicomMetadataHandler:
         Returns:
             Dictionary containing all extracted metadata
         """
+        cached: Optional[Dict[str, Any]] = self.metadata.get('full_metadata')
+        if cached is not None:
+            return cached
+
         metadata = {
             'all_attributes': self.extract_all_attributes(),
             'tag_extraction': self._extract_by_tags(),
@@ -279,6 +560,7 @@ class DicomMetadataHandler:
             'ultrasound_region': self.extract_ultrasound_region() if hasattr(self.dicom, 'Modality') and self.dicom.Modality == 'US' else None
         }
         
+        self.metadata['full_metadata'] = metadata
         return metadata
 
     def _extract_by_tags(self) -> Dict[str, Dict[str, str]]:
@@ -287,85 +569,9 @@ class DicomMetadataHandler:
         Returns:
             Dictionary of metadata extracted by tags
         """
-        tag_mappings = {
-            'patient_info': {
-                'PatientName': '00100010',
-                'PatientID': '00100020',
-                'PatientBirthDate': '00100030',
-                'PatientSex': '00100040',
-                'PatientAge': '00101010',
-                'PatientWeight': '00101030',
-                'IssuerOfPatientID': '00100021'
-            },
-            'study_info': {
-                'StudyInstanceUID': '0020000D',
-                'StudyDate': '00080020',
-                'StudyTime': '00080030',
-                'StudyDescription': '00081030',
-                'StudyID': '00200010',
-                'AccessionNumber': '00080050',
-                'ReferringPhysicianName': '00080090',
-                'PerformingPhysicianName': '00081050',
-                'InstitutionName': '00080080',
-                'InstitutionAddress': '00080081'
-            },
-            'series_info': {
-                'SeriesInstanceUID': '0020000E',
-                'SeriesNumber': '00200011',
-                'Modality': '00080060',
-                'SeriesDescription': '0008103E',
-                'AcquisitionDate': '00080022',
-                'AcquisitionTime': '00080032',
-                'AcquisitionNumber': '00200012',
-                'AcquisitionProtocolName': '00181030'
-            },
-            'image_info': {
-                'SOPInstanceUID': '00080018',
-                'SOPClassUID': '00080016',
-                'ImageType': '00080008',
-                'InstanceCreationDate': '00080012',
-                'InstanceCreationTime': '00080013'
-            },
-            'transfer_syntax': {
-                'TransferSyntaxUID': '00020010',
-                'ReferencedTransferSyntaxUI': '00041512',
-                'MACCalculationTransferSyntaxUID': '04000010',
-                'EncryptedContentTransferSyntaxUID': '04000500'
-            },
-            'geometry': {
-                'PixelSpacing': '00280030',
-                'Height': '00280010',
-                'Width': '00280011',
-                'NumberOfFrames': '00280008',
-                'SliceThickness': '00180050',
-                'PhotometricInterpretation': '00280004',
-                'PhysicalDeltaX': '0018602c',
-                'PhysicalDeltaY': '0018602e'
-            },
-            'device_info': {
-                'Manufacturer': '00080070',
-                'ManufacturerModelName': '00080080',
-                'DeviceSerialNumber': '00181000'
-            },
-            'protocol_info': {
-                'ProtocolName': '00181030',
-                'ContrastBolusAgent': '00180010'
-            },
-            'pixel_data': {
-                'BitsAllocated': '00280100',
-                'BitsStored': '00280101',
-                'HighBit': '00280102',
-                'PixelRepresentation': '00280103'
-            }
-        }
-
-        tag_metadata = {
-            category: {
-                key: self._get_dicom_tag(tag)
-                for key, tag in category_tags.items()
-            }
-            for category, category_tags in tag_mappings.items()
-        }
+        tag_metadata: Dict[str, Dict[str, str]] = {category: {} for category in _TAG_MAPPINGS}
+        for category, key, tag in _TAG_INDEX:
+            tag_metadata[category][key] = self._get_dicom_tag(tag)
 
         return tag_metadata
 
@@ -375,45 +581,15 @@ class DicomMetadataHandler:
         Returns:
             Dictionary of metadata extracted by attributes
         """
-        attribute_mappings = {
-            'patient_info': [
-                'PatientName', 'PatientID', 'PatientBirthDate',
-                'PatientSex', 'PatientAge', 'PatientWeight'
-            ],
-            'study_info': [
-                'StudyInstanceUID', 'StudyDate', 'StudyTime',
-                'StudyDescription', 'StudyID'
-            ],
-            'series_info': [
-                'SeriesInstanceUID', 'SeriesNumber',
-                'Modality', 'SeriesDescription'
-            ],
-            'instance_info': [
-                'SOPInstanceUID', 'SOPClassUID', 'ImageType',
-                'InstanceCreationDate', 'InstanceCreationTime'
-            ],
-            'geometry': [
-                'PixelSpacing', 'Height', 'Width', 'NumberOfFrames',
-                'SliceThickness', 'PhotometricInterpretation',
-                'PhysicalDeltaX', 'PhysicalDeltaY'
-            ],
-            'device_info': [
-                'Manufacturer', 'ManufacturerModelName', 'DeviceSerialNumber'
-            ],
-            'pixel_data': [
-                'BitsAllocated', 'BitsStored', 'HighBit', 'PixelRepresentation'
-            ]
-        }
-
         extracted = {}
-        for category, attributes in attribute_mappings.items():
-            extracted[category] = {}
-            for attr in attributes:
-                try:
-                    value = getattr(self.dicom, attr, '')
-                    extracted[category][attr] = str(value) if value else ''
-                except Exception:
-                    extracted[category][attr] = ''
+        for category, attributes in _ATTRIBUTE_MAPPINGS.items():
+            values: Iterable[Any]
+            try:
+                values = _ATTRIBUTE_GETTERS[category](self.dicom)
+            except Exception:
+                # Some attribute is missing (or fails to convert), get them one by one
+                values = [_get_attribute(self.dicom, attr) for attr in attributes]
+            extracted[category] = dict(zip(attributes, map(_attribute_str, values)))
 
         return extracted
 
@@ -423,18 +599,16 @@ class DicomMetadataHandler:
         Returns:
             Dictionary of file metadata
         """
-        file_meta_attributes = [
-            'MediaStorageSOPClassUID',
-            'MediaStorageSOPInstanceUID',
-            'TransferSyntaxUID',
-            'ImplementationClassUID'
-        ]
-
         extracted = {}
-        for attr in file_meta_attributes:
+        for attr, tag in _FILE_META_UID_TAGS:
             try:
-                value = getattr(self.dicom.file_meta, attr, '')
-                extracted[attr] = str(value) if value else ''
+                elem = self.dicom.file_meta.get_item(tag)
+                if isinstance(elem, RawDataElement) and isinstance(elem.value, bytes):
+                    # Decoded as is, pydicom's conversion isn't needed for a UID
+                    extracted[attr] = elem.value.rstrip(b'\x00 ').decode('ascii')
+                else:
+                    value = elem.value if elem is not None else ''
+                    extracted[attr] = str(value) if value else ''
             except Exception:
                 extracted[attr] = ''
 
@@ -447,8 +621,7 @@ class DicomMetadataHandler:
             Dictionary of pixel information or None if retrieval fails
         """
         try:
-            physical_delta_x = round(float(self.dicom["00186011"][0]["0018602C"].value) * 10, 5)
-            physical_delta_y = round(float(self.dicom["00186011"][0]["0018602E"].value) * 10, 5)
+            physical_delta_x, physical_delta_y = _physical_deltas(self.dicom[ULTRASOUND_REGIONS_TAG][0])
 
             return {
                 'physical_delta_x': physical_delta_x,
@@ -468,8 +641,7 @@ class DicomMetadataHandler:
         """
         try:
             # this function will be used in claruis dicoms getting the pixel data for each frame
-            physical_delta_x = round(float(self.dicom["00186011"][frame_index]["0018602C"].value) * 10, 5)
-            physical_delta_y = round(float(self.dicom["00186011"][frame_index]["0018602E"].value) * 10, 5)
+            physical_delta_x, physical_delta_y = _physical_deltas(self.dicom[ULTRASOUND_REGIONS_TAG][frame_index])
             pixel_info = {
                 'frame_index': frame_index,
                 'physical_delta_x': physical_delta_x,
@@ -491,7 +663,7 @@ class DicomMetadataHandler:
         except Exception:
             return None
 
-    def extract_dicom_metadata(self, extractor: Dict[str, Any]):
+    def extract_dicom_metadata(self, extractor: Dict[str, Any]) -> Dict[str, Any]:
         """
         Extract and process DICOM metadata from the extractor results.
         
@@ -502,13 +674,13 @@ class DicomMetadataHandler:
             DicomResult containing processed metadata
         """
         # Use the all_attributes data for a comprehensive result
-        all_attributes = extractor.get('all_attributes', {})
+        all_attributes: Dict[str, Any] = extractor.get('all_attributes', {})
         
         # Create a DicomResult with the comprehensive data
         return all_attributes
 
 
-    def _get_dicom_tag(self, tag: str, default=""):
+    def _get_dicom_tag(self, tag: Union[str, int], default: str = "") -> str:
         """Extract value for a specific DICOM tag.
 
         Args:
@@ -527,14 +699,17 @@ class DicomMetadataHandler:
                     current_value = current_value[t]
                 value = current_value.value
             else:
-                # Regular single tag handling
+                # Regular single tag handling, DS/IS straight from their text
+                raw_numeric = _raw_numeric_strings(self.dicom, tag)
+                if raw_numeric is not None:
+                    return '; '.join(raw_numeric[1])
                 value = self.dicom[tag].value
 
             # Handle different value types
             if isinstance(value, (list, pydicom.multival.MultiValue)):
-                return '; '.join(str(v) for v in value)
+                return '; '.join(map(str, value))
             elif isinstance(value, bytes):
                 return value.decode('utf-8', errors='ignore')
             return str(value)
         except Exception:
-            return default
\ No newline at end of file
+            return default
@@ -0,0 +1,125 @@
+"""Per-instance summaries of retrieved DICOM datasets.
+
+These run in the summary process pool, whose workers are spawned and import
+this module on start-up, so it only depends on pydicom and the standard
+library. In particular it logs through a plain module logger rather than
+app.core.logger, which would attach another handler to the server's rotating
+log file in every worker.
+"""
+import logging
+
+from typing import Any, Callable, Dict, Optional
+
+from pydicom import dcmread
+from pydicom.dataelem import DataElement
+from pydicom.dataset import Dataset
+from pydicom.multival import MultiValue
+
+logger = logging.getLogger(__name__)
+
+# Elements larger than this (in practice Pixel Data) are left in the source
+# buffer or file and only read when accessed
+DEFER_SIZE = "64 KB"
+
+PIXEL_DATA_TAG = 0x7FE00010
+_INSTANCE_UID_TAGS = (
+    (0x00080018, 'SOPInstanceUID'),
+    (0x0020000E, 'SeriesInstanceUID'),
+    (0x0020000D, 'StudyInstanceUID'),
+)
+
+# Patient/study level attributes are identical for every instance of a study and
+# the client already has them from its C-FIND, so they are only repeated per
+# instance when explicitly requested.
+_STUDY_LEVEL_KEYWORDS = frozenset({
+    'PatientName', 'PatientID', 'IssuerOfPatientID', 'PatientBirthDate', 'PatientSex',
+    'PatientAge', 'PatientSize', 'PatientWeight', 'StudyDate', 'StudyTime',
+    'StudyDescription', 'StudyID', 'AccessionNumber', 'ReferringPhysicianName',
+})
+# Geometry is constant within a (homogeneous) series and reported once per series
+_SERIES_GEOMETRY_KEYWORDS = frozenset({'Rows', 'Columns', 'PixelSpacing'})
+
+def _as_str(value: Any) -> str:
+    # str subclasses (pydicom's UID) are returned as is, orjson encodes them natively
+    return value if isinstance(value, str) else str(value)
+
+def _as_strs(value: Any) -> Any:
+    # A multi-valued element (ImageType, say) becomes a list of strings
+    if isinstance(value, MultiValue):
+        return [_as_str(item) for item in value]
+    return _as_str(value)
+
+# VR -> conversion, looked up once per element
+_VR_CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    **dict.fromkeys(('PN', 'DA', 'TM', 'DT', 'LO', 'SH', 'CS', 'UI'), _as_strs),
+    'SQ': lambda value: "Sequence data available",
+}
+_BULK_VRS = frozenset({'OB', 'OW', 'OF', 'OD', 'UN'})
+
+def element_value(elem: DataElement) -> Any:
+    """Convert a data element value to a JSON-friendly primitive.
+
+    Numbers stay numbers (pydicom's IS/DS are int/float subclasses) and
+    multi-valued elements become lists, as in the DICOM JSON model.
+    """
+    vr = elem.VR
+    value = elem.value
+    converter = _VR_CONVERTERS.get(vr)
+    if converter is not None:
+        return converter(value)
+    if vr in _BULK_VRS:
+        # None is pydicom's empty value for these VRs, as a C-FIND echoes
+        # back the empty Pixel Data key of the query
+        return f"{vr} data ({len(value)} bytes)" if value is not None else None
+    if isinstance(value, MultiValue):
+        return list(value)
+    return value
+
+def summarize_instance(dataset: Dataset, include_details: bool, pixel_data_length: Optional[int]) -> Dict[str, Any]:
+    """Build the per-instance dict returned by get_study_with_pixels.
+
+    Pixel Data is not read, callers pass its length instead.
+    """
+    result_dict = {}
+
+    # Add key identifiers if available
+    for tag, keyword in _INSTANCE_UID_TAGS:
+        elem = dataset.get(tag)
+        if elem is not None:
+            result_dict[keyword] = _as_str(elem.value)
+
+    # Process all elements in the dataset, skipping PixelData by tag
+    for elem in dataset:
+        if elem.tag == PIXEL_DATA_TAG:
+            continue
+        keyword = elem.keyword
+        if not keyword or keyword in _SERIES_GEOMETRY_KEYWORDS:
+            continue
+        if not include_details and keyword in _STUDY_LEVEL_KEYWORDS:
+            continue
+        try:
+            result_dict[keyword] = element_value(elem)
+        except Exception as e:
+            result_dict[keyword] = f"{elem.VR} data (conversion error)"
+            logger.warning("Error converting %s: %s", keyword, e)
+
+    # Check if pixel data exists
+    if pixel_data_length is not None:
+        result_dict['HasPixelData'] = True
+        result_dict['PixelDataLength'] = pixel_data_length
+    else:
+        result_dict['HasPixelData'] = False
+
+    return result_dict
+
+def summarize_file(path: str, include_details: bool) -> Dict[str, Any]:
+    """Summarize a spooled instance without loading its Pixel Data."""
+    dataset = dcmread(path, defer_size=DEFER_SIZE)
+    pixel_data_length = None
+    if PIXEL_DATA_TAG in dataset:
+        pixel_data_length = dataset.get_item(PIXEL_DATA_TAG).length
+        if pixel_data_length == 0xFFFFFFFF:
+            # Encapsulated, the length is only known once the fragments are read
+            pixel_data_length = len(dataset.PixelData)
+        del dataset[PIXEL_DATA_TAG]
+    return summarize_instance(dataset, include_details, pixel_data_length)
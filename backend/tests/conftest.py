@@ -0,0 +1,11 @@
+import os
+
+# The committed src/.env keeps comments after some integer values, which
+# starlette's Config does not strip; the compose environment overrides them
+# when the app runs, the tests do the same before app.core.config is imported.
+for name, value in (
+    ("POSTGRES_PORT", "5432"),
+    ("ACCESS_TOKEN_EXPIRE_MINUTES", "30"),
+    ("REFRESH_TOKEN_EXPIRE_DAYS", "7"),
+):
+    os.environ.setdefault(name, value)
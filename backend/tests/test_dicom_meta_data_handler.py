@@ -0,0 +1,115 @@
+from io import BytesIO
+
+from pydicom import dcmread
+from pydicom.dataset import Dataset, FileMetaDataset
+from pydicom.encaps import encapsulate
+from pydicom.sequence import Sequence
+from pydicom.uid import ExplicitVRLittleEndian, JPEGBaseline8Bit, generate_uid
+from pynetdicom.sop_class import UltrasoundImageStorage
+
+from app.services.service_utils.dicom_meta_data_handler import DicomMetadataHandler, _pixel_data_length
+
+
+def _image(transfer_syntax=ExplicitVRLittleEndian):
+    ds = Dataset()
+    ds.file_meta = FileMetaDataset()
+    ds.file_meta.TransferSyntaxUID = transfer_syntax
+    ds.file_meta.MediaStorageSOPClassUID = UltrasoundImageStorage
+    ds.file_meta.MediaStorageSOPInstanceUID = generate_uid()
+    ds.SOPClassUID = UltrasoundImageStorage
+    ds.SOPInstanceUID = ds.file_meta.MediaStorageSOPInstanceUID
+    ds.Rows = 2
+    ds.Columns = 4
+    ds.BitsAllocated = 8
+    ds.SamplesPerPixel = 1
+    ds.PhotometricInterpretation = "MONOCHROME2"
+    return ds
+
+
+def _read_back(ds):
+    buffer = BytesIO()
+    ds.save_as(buffer, write_like_original=False)
+    buffer.seek(0)
+    return dcmread(buffer)
+
+
+def test_pixel_data_length_of_read_dataset():
+    ds = _image()
+    ds.PixelData = bytes(8)
+    assert _pixel_data_length(_read_back(ds)) == 8
+
+
+def test_pixel_data_length_of_dataset_built_in_memory():
+    ds = _image()
+    ds.PixelData = bytes(8)
+    assert _pixel_data_length(ds) == 8
+
+
+def test_pixel_data_length_of_encapsulated_pixel_data():
+    ds = _image(JPEGBaseline8Bit)
+    ds.PixelData = encapsulate([b"\xff\xd8\xff\xd9"])
+    ds["PixelData"].VR = "OB"
+    read = _read_back(ds)
+    assert read.get_item(0x7FE00010).length == 0xFFFFFFFF
+    assert _pixel_data_length(read) == len(ds.PixelData)
+
+
+def test_extract_all_attributes_converts_nested_sequences():
+    inner = Dataset()
+    inner.CodeValue = "T-D3000"
+    inner.CodeMeaning = "Chest"
+    middle = Dataset()
+    middle.PatientName = "NESTED^PATIENT"
+    middle.AnatomicRegionSequence = Sequence([inner])
+    ds = _image()
+    ds.PatientName = "TEST^PATIENT"
+    ds.ReferencedStudySequence = Sequence([middle, Dataset()])
+    ds.PixelData = bytes(8)
+
+    result = DicomMetadataHandler(_read_back(ds)).extract_all_attributes()
+
+    assert result['ReferencedStudySequence'] == [
+        {
+            'PatientName': "NESTED^PATIENT",
+            'AnatomicRegionSequence': [{'CodeValue': "T-D3000", 'CodeMeaning': "Chest"}],
+        },
+        {},
+    ]
+    assert result['PixelData'] == "PixelData present (8 bytes)"
+    assert result['PixelDataInfo']['Dimensions'] == "2x4"
+
+
+def test_numeric_strings_are_extracted_as_text_whether_converted_or_not():
+    ds = _image()
+    ds.ImageType = ['ORIGINAL', 'PRIMARY']
+    ds.PixelSpacing = ['0.1', '0.25']
+    ds.SliceThickness = '2.5'
+    ds.InstanceNumber = '3'
+    read = _read_back(ds)
+
+    # The read back dataset has its DS/IS elements still encoded, ds has them converted
+    for dataset in (read, ds):
+        result = DicomMetadataHandler(dataset).extract_all_attributes()
+        assert result['ImageType'] == ['ORIGINAL', 'PRIMARY']
+        assert result['PixelSpacing'] == ['0.1', '0.25']
+        assert result['SliceThickness'] == '2.5'
+        assert result['InstanceNumber'] == '3'
+    assert DicomMetadataHandler(read)._get_dicom_tag(0x00280030) == '0.1; 0.25'
+
+
+def test_pixel_info_of_each_ultrasound_region_in_mm():
+    regions = []
+    for delta_x, delta_y in ((0.01, 0.02), (0.003, 0.004)):
+        region = Dataset()
+        region.PhysicalDeltaX = delta_x
+        region.PhysicalDeltaY = delta_y
+        regions.append(region)
+    ds = _image()
+    ds.SequenceOfUltrasoundRegions = Sequence(regions)
+    handler = DicomMetadataHandler(_read_back(ds))
+
+    assert handler.extract_pixel_info_from_physical() == {'physical_delta_x': 0.1, 'physical_delta_y': 0.2}
+    assert handler.extract_pixel_info_by_frame_index(1) == {
+        'frame_index': 1, 'physical_delta_x': 0.03, 'physical_delta_y': 0.04,
+    }
+    assert handler.extract_pixel_info_by_frame_index(2) is None
@@ -0,0 +1,32 @@
+import asyncio
+from io import BytesIO
+
+from fastapi import UploadFile
+
+from app.api.v1 import dicom_net
+from app.services.dicom_network_interface import DicomResult
+
+
+class RecordingInterface:
+    """Records the uploads the routes hand to the DICOM network interface."""
+
+    def __init__(self):
+        self.uploads = []
+
+    def upload_file(self, dicom_data, filename):
+        self.uploads.append((dicom_data, filename))
+        return DicomResult(success=True, message="DICOM file uploaded successfully", status_code=200)
+
+    async def upload_file_dataset(self, dataset):
+        raise AssertionError("the upload was decoded into a dataset")
+
+
+def test_upload_file_route_sends_the_uploaded_bytes():
+    interface = RecordingInterface()
+    content = b"\x00" * 128 + b"DICM not parsed by the route"
+    upload = UploadFile(BytesIO(content), filename="image.dcm")
+
+    result = asyncio.run(dicom_net.upload_file(dicom_file=upload, dicom_network_interface=interface))
+
+    assert result.status_code == 200
+    assert interface.uploads == [(content, "image.dcm")]
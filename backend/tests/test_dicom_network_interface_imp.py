@@ -0,0 +1,438 @@
+import asyncio
+import os
+import socket
+import threading
+import time
+from contextlib import aclosing
+from io import BytesIO
+
+from types import SimpleNamespace
+
+import pytest
+from pydicom import dcmread
+from pydicom.dataset import Dataset, FileMetaDataset
+from pydicom.filebase import DicomBytesIO
+from pydicom.filewriter import write_dataset
+from pydicom.uid import ExplicitVRLittleEndian, generate_uid
+from pynetdicom import AE, evt
+from pynetdicom.sop_class import CTImageStorage
+
+from app.services.implementation import dicom_network_interface_imp as imp
+from app.services.implementation.dicom_network_interface_imp import DicomNetworkInterfaceImp
+
+
+class FakeAssociation:
+    """Stands in for an established pynetdicom Association.
+
+    A C-GET sends a C-STORE request to the evt_handlers for each requested
+    dataset of get_datasets, then answers with get_responses if given. A
+    C-MOVE sends them to the storage SCP at move_port instead.
+    """
+
+    def __init__(self, find_responses=(), get_datasets=(), get_responses=None, evt_handlers=(), move_port=None):
+        self.is_established = True
+        self.released = threading.Event()
+        self.aborted = threading.Event()
+        self.stored = []
+        self.get_requests = []
+        self._find_responses = find_responses
+        self._get_datasets = get_datasets
+        self._get_responses = get_responses
+        self._move_port = move_port
+        self._store_handlers = [handler for handler in evt_handlers if handler[0] is evt.EVT_C_STORE]
+
+    def send_c_store(self, dataset):
+        self.stored.append(dataset)
+        return _status(0x0000)
+
+    def send_c_find(self, ds, model):
+        return self._find_responses
+
+    def send_c_get(self, ds, model):
+        self.get_requests.append(ds)
+        # An IMAGE level request only gets the instance it names
+        requested = ds.get("SOPInstanceUID")
+        for dataset in self._get_datasets:
+            if requested is not None and dataset.SOPInstanceUID != requested:
+                continue
+            for _, handler, *args in self._store_handlers:
+                handler(FakeStoreEvent(dataset), *(args[0] if args else ()))
+        if self._get_responses is not None:
+            return iter(self._get_responses)
+        return iter([(_status(0x0000), None)])
+
+    def send_c_move(self, ds, move_aet, model, msg_id=1):
+        """Send get_datasets to the move destination, listening at move_port on this host."""
+        statuses = _store_over_network(self._move_port, move_aet, self._get_datasets, originator_id=msg_id)
+        self.move_statuses = statuses
+        yield _status(0x0000), None
+
+    def release(self):
+        self.is_established = False
+        self.released.set()
+
+    def abort(self):
+        self.is_established = False
+        self.aborted.set()
+
+
+class FakeStoreEvent:
+    """A C-STORE request for dataset, as an EVT_C_STORE handler sees it."""
+
+    def __init__(self, dataset, move_originator_message_id=None):
+        transfer_syntax = dataset.file_meta.TransferSyntaxUID
+        buffer = DicomBytesIO()
+        buffer.is_little_endian = transfer_syntax.is_little_endian
+        buffer.is_implicit_VR = transfer_syntax.is_implicit_VR
+        write_dataset(buffer, dataset)
+        self.file_meta = dataset.file_meta
+        self.context = SimpleNamespace(transfer_syntax=transfer_syntax)
+        self.request = SimpleNamespace(
+            DataSet=BytesIO(buffer.getvalue()),
+            AffectedSOPInstanceUID=dataset.SOPInstanceUID,
+            MoveOriginatorMessageID=move_originator_message_id,
+        )
+
+
+def _store_over_network(port, ae_title, datasets, originator_id):
+    """C-STORE datasets to the SCP listening at port, as a PACS performing a C-MOVE does."""
+    ae = AE(ae_title="PACS")
+    ae.add_requested_context(CTImageStorage, ExplicitVRLittleEndian)
+    assoc = ae.associate("127.0.0.1", port, ae_title=ae_title)
+    assert assoc.is_established
+    try:
+        return [
+            assoc.send_c_store(dataset, originator_aet="PACS", originator_id=originator_id).Status
+            for dataset in datasets
+        ]
+    finally:
+        assoc.release()
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class GatedResponses:
+    """C-GET responses that only complete once gate is set."""
+
+    def __init__(self, gate):
+        self.gate = gate
+
+    def __iter__(self):
+        self.gate.wait(5)
+        yield _status(0x0000), None
+
+
+def _fake_peer(monkeypatch, service, **responses):
+    """Answer the service's association requests with FakeAssociations, returned in request order."""
+    associations = []
+
+    def associate(ae, evt_handlers=(), **kwargs):
+        assoc = FakeAssociation(evt_handlers=evt_handlers, **responses)
+        associations.append(assoc)
+        return assoc
+
+    monkeypatch.setattr(service, "_associate", associate)
+    return associations
+
+
+def _status(code):
+    status = Dataset()
+    status.Status = code
+    return status
+
+
+def _match(number):
+    identifier = Dataset()
+    identifier.StudyInstanceUID = f"1.2.3.{number}"
+    identifier.PatientName = f"PATIENT^{number}"
+    return identifier
+
+
+def _find_responses(count):
+    for number in range(count):
+        yield _status(0xFF00), _match(number)
+    yield _status(0x0000), None
+
+
+def _encoded(dataset):
+    buffer = BytesIO()
+    dataset.save_as(buffer, write_like_original=False)
+    return buffer.getvalue()
+
+
+def _ct_image(study_uid="1.2.3"):
+    ds = Dataset()
+    ds.file_meta = FileMetaDataset()
+    ds.file_meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    ds.file_meta.MediaStorageSOPClassUID = CTImageStorage
+    ds.file_meta.MediaStorageSOPInstanceUID = generate_uid()
+    ds.SOPClassUID = CTImageStorage
+    ds.SOPInstanceUID = ds.file_meta.MediaStorageSOPInstanceUID
+    ds.StudyInstanceUID = study_uid
+    ds.PatientName = "TEST^PATIENT"
+    return ds
+
+
+@pytest.fixture
+def service():
+    service = DicomNetworkInterfaceImp(None, "127.0.0.1", 11112, "PACS", "TEST")
+    yield service
+    service.close()
+
+
+def test_upload_files_reports_errors_per_file(service, monkeypatch):
+    assoc = FakeAssociation()
+    monkeypatch.setattr(service, "_associate", lambda ae, **kwargs: assoc)
+    no_sop_class = _ct_image()
+    del no_sop_class.SOPClassUID
+
+    results = service.upload_files([_encoded(_ct_image()), _encoded(no_sop_class), b"not a DICOM file"])
+
+    assert [result.status_code for result in results] == [200, 400, 400]
+    assert "no SOPClassUID" in results[1].message
+    assert len(assoc.stored) == 1
+    assert assoc.released.is_set()
+
+
+def test_identifier_dict_keeps_match_when_an_element_fails(monkeypatch):
+    identifier = _match(1)
+    identifier.add_new(0x7FE00010, "OB", None)
+    assert imp._identifier_dict(identifier)["PixelData"] is None
+
+    def element_value(elem):
+        if elem.keyword == "PatientName":
+            raise ValueError("bad value")
+        return str(elem.value)
+
+    monkeypatch.setattr(imp, "element_value", element_value)
+    result = imp._identifier_dict(identifier)
+    assert result["PatientName"] == "Error: bad value"
+    assert result["StudyInstanceUID"] == "1.2.3.1"
+
+
+def test_find_studies_stream_with_slow_consumer(service, monkeypatch):
+    count = imp._RECEIVE_QUEUE_SIZE * 2
+    assoc = FakeAssociation(_find_responses(count))
+    monkeypatch.setattr(service, "_associate", lambda ae, **kwargs: assoc)
+
+    async def consume():
+        received = []
+        async for match in service.find_studies_stream({"StudyInstanceUID": ""}):
+            # The producer is blocked on the full queue by now, and must not
+            # hold up the requests sharing the cached association meanwhile
+            await asyncio.sleep(0.01)
+            assert service._assoc_lock.acquire(blocking=False)
+            service._assoc_lock.release()
+            received.append(match)
+        return received
+
+    received = asyncio.run(consume())
+    assert [match["StudyInstanceUID"] for match in received] == [f"1.2.3.{number}" for number in range(count)]
+    assert assoc.released.wait(5)
+    assert not assoc.aborted.is_set()
+
+
+def test_find_studies_stream_aborts_when_consumer_stops(service, monkeypatch):
+    assoc = FakeAssociation(_find_responses(imp._RECEIVE_QUEUE_SIZE * 4))
+    monkeypatch.setattr(service, "_associate", lambda ae, **kwargs: assoc)
+
+    async def consume_one():
+        async with aclosing(service.find_studies_stream({"StudyInstanceUID": ""})) as stream:
+            async for match in stream:
+                return match
+
+    match = asyncio.run(consume_one())
+    assert match["StudyInstanceUID"] == "1.2.3.0"
+    assert assoc.aborted.wait(5)
+    assert not assoc.released.is_set()
+
+
+def test_find_studies_drops_association_on_unexpected_error(service, monkeypatch):
+    def responses():
+        yield _status(0xFF00), _match(0)
+        raise TypeError("unexpected")
+
+    assoc = FakeAssociation(responses())
+
+    def ensure_assoc(contexts):
+        service._assoc = assoc
+        return assoc
+
+    monkeypatch.setattr(service, "_ensure_assoc", ensure_assoc)
+    with pytest.raises(TypeError):
+        service._find_studies({"PatientName": "*", "StudyInstanceUID": ""})
+    # Its unread responses must not reach the next request
+    assert assoc.aborted.is_set()
+    assert service._assoc is None
+
+
+def test_retrieval_error_does_not_return_association_to_pool(service, monkeypatch):
+    image = _ct_image()
+
+    def responses():
+        yield _status(0xFF00), None
+        raise KeyError("unexpected")
+
+    associations = _fake_peer(monkeypatch, service, get_datasets=[image], get_responses=responses())
+    with pytest.raises(KeyError):
+        service._get_instance_file("1.2.3", "1.2.3.4", image.SOPInstanceUID)
+    # The next retrieval must not read the pending responses of this one
+    assert associations[0].aborted.is_set()
+    assert service._get_idle == []
+
+
+def test_retrievals_reuse_pooled_association(service, monkeypatch):
+    associations = _fake_peer(monkeypatch, service)
+    for number in range(3):
+        service._get_instance_file("1.2.3", "1.2.3.4", f"1.2.3.4.{number}")
+    assert len(associations) == 1
+    assert len(associations[0].get_requests) == 3
+    assert [pooled.assoc for pooled in service._get_idle] == associations
+
+
+def test_parallel_retrievals_are_limited_to_max_associations(monkeypatch):
+    service = DicomNetworkInterfaceImp(None, "127.0.0.1", 11112, "PACS", "TEST", max_associations=2)
+    gate = threading.Event()
+    associations = _fake_peer(monkeypatch, service, get_responses=GatedResponses(gate))
+    threads = [
+        threading.Thread(target=service._get_instance_file, args=("1.2.3", "1.2.3.4", f"1.2.3.4.{number}"))
+        for number in range(3)
+    ]
+    try:
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + 5
+        while len(associations) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # The third retrieval waits for a free slot rather than associating
+        time.sleep(0.1)
+        assert len(associations) == 2
+        gate.set()
+        for thread in threads:
+            thread.join(5)
+        assert sum(len(assoc.get_requests) for assoc in associations) == 3
+        assert len(service._get_idle) == 2
+    finally:
+        gate.set()
+        service.close()
+
+
+def test_retrieved_instance_is_served_from_cache(service, monkeypatch):
+    image = _ct_image()
+    associations = _fake_peer(monkeypatch, service, get_datasets=[image])
+
+    first = service._get_instance_file("1.2.3", "1.2.3.4", image.SOPInstanceUID)
+    second = service._get_instance_file("1.2.3", "1.2.3.4", image.SOPInstanceUID)
+
+    assert first.status_code == second.status_code == 200
+    assert second.data == first.data
+    assert dcmread(BytesIO(second.data)).SOPInstanceUID == image.SOPInstanceUID
+    assert len(associations[0].get_requests) == 1
+
+
+def test_instance_cache_evicts_least_recently_used(service, monkeypatch):
+    images = [_ct_image() for _ in range(3)]
+    # Same size instances
+    for number, image in enumerate(images):
+        image.SOPInstanceUID = image.file_meta.MediaStorageSOPInstanceUID = f"1.2.3.4.{number}"
+    associations = _fake_peer(monkeypatch, service, get_datasets=images)
+    size = len(service._get_instance_file("1.2.3", "1.2.3.4", images[0].SOPInstanceUID).data)
+    # Room for two instances
+    monkeypatch.setattr(imp, "_INSTANCE_CACHE_MAX_BYTES", size * 2 + size // 2)
+
+    for image in (images[1], images[0], images[2]):
+        service._get_instance_file("1.2.3", "1.2.3.4", image.SOPInstanceUID)
+
+    # images[1] was used least recently when images[2] came in
+    assert list(service._instance_cache) == [images[0].SOPInstanceUID, images[2].SOPInstanceUID]
+    assert service._instance_cache_bytes == size * 2
+    assert len(os.listdir(service._instance_cache_dir)) == 2
+    service._get_instance_file("1.2.3", "1.2.3.4", images[1].SOPInstanceUID)
+    assert len(associations[0].get_requests) == 4
+
+
+def test_study_retrieved_via_move_arrives_at_storage_scp(monkeypatch):
+    port = _free_port()
+    service = DicomNetworkInterfaceImp(None, "127.0.0.1", 11112, "PACS", "TEST", storage_scp_port=port)
+    images = [_ct_image(), _ct_image()]
+    for image, series in zip(images, ("1.2.3.1", "1.2.3.2")):
+        image.SeriesInstanceUID = series
+    associations = _fake_peer(monkeypatch, service, get_datasets=images, move_port=port)
+    try:
+        result = service._get_study_with_pixels("1.2.3", False, "series", True)
+
+        assert result.status_code == 200
+        assert associations[0].move_statuses == [0x0000, 0x0000]
+        assert result.data["summary"]["total_instances"] == 2
+        assert result.data["summary"]["total_series"] == 2
+        assert associations[0].released.is_set()
+        # The SCP keeps running, but only for C-MOVEs in progress
+        assert _store_over_network(port, "TEST", images[:1], originator_id=1) == [0xA700]
+    finally:
+        service.close()
+
+
+def test_finds_reuse_cached_association(service, monkeypatch):
+    responses = [(_status(0xFF00), _match(0)), (_status(0x0000), None)]
+    associations = _fake_peer(monkeypatch, service, find_responses=responses)
+
+    for _ in range(3):
+        result = service._find_studies({"StudyInstanceUID": ""})
+        assert [match["StudyInstanceUID"] for match in result.data] == ["1.2.3.0"]
+    assert len(associations) == 1
+    assert not associations[0].released.is_set()
+
+
+def test_idle_cached_association_is_released(service, monkeypatch):
+    monkeypatch.setattr(imp, "_ASSOC_IDLE_SECONDS", 0.05)
+    associations = _fake_peer(monkeypatch, service, find_responses=[(_status(0x0000), None)])
+
+    service._find_studies({"StudyInstanceUID": ""})
+
+    assert associations[0].released.wait(5)
+    with service._assoc_lock:
+        assert service._assoc is None
+
+
+def test_full_study_instances_are_summarized_in_worker_processes(service, monkeypatch):
+    images = [_ct_image() for _ in range(3)]
+    for number, image in enumerate(images):
+        image.SeriesInstanceUID = "1.2.3.1"
+        image.InstanceNumber = number + 1
+        image.add_new(0x7FE00010, "OB", bytes(8))
+    _fake_peer(monkeypatch, service, get_datasets=images)
+
+    result = service._get_study_with_pixels("1.2.3", False, "full", False)
+
+    assert result.status_code == 200
+    assert service._summary_pool is not None
+    [series] = result.data["series"]
+    assert series["InstanceCount"] == 3
+    # In arrival order, whichever worker finished first
+    assert [instance["SOPInstanceUID"] for instance in series["instances"]] == [
+        image.SOPInstanceUID for image in images
+    ]
+    for instance in series["instances"]:
+        assert instance["PixelDataLength"] == 8
+        # Study level attributes are only repeated with include_details
+        assert "PatientName" not in instance
+
+
+def test_upload_file_sends_the_file_without_decoding_it(service, monkeypatch):
+    assoc = FakeAssociation()
+
+    def ensure_assoc(contexts):
+        service._assoc = assoc
+        return assoc
+
+    monkeypatch.setattr(service, "_ensure_assoc", ensure_assoc)
+    result = service.upload_file(_encoded(_ct_image()), "image.dcm")
+
+    assert result.status_code == 200
+    # pynetdicom reads the encoded dataset from the file as is
+    [sent] = assoc.stored
+    assert isinstance(sent, str)
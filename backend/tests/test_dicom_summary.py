@@ -0,0 +1,29 @@
+from pydicom.dataset import Dataset
+
+from app.services.service_utils.dicom_summary import element_value
+
+
+def _element(vr, value, tag=0x7FE00010):
+    ds = Dataset()
+    ds.add_new(tag, vr, value)
+    return ds[tag]
+
+
+def test_element_value_empty_bulk_element_is_none():
+    # A C-FIND match echoing back the empty Pixel Data key of the query
+    assert element_value(_element('OB', None)) is None
+    assert element_value(_element('OW', None)) is None
+
+
+def test_element_value_bulk_element_reports_its_size():
+    assert element_value(_element('OB', b'\x00' * 4)) == "OB data (4 bytes)"
+
+
+def test_element_value_multi_valued_element_is_a_list():
+    ds = Dataset()
+    ds.ImageType = ['ORIGINAL', 'PRIMARY']
+    ds.add_new(0x00280034, 'IS', ['1', '2'])
+    ds.Modality = 'US'
+    assert element_value(ds['ImageType']) == ['ORIGINAL', 'PRIMARY']
+    assert element_value(ds[0x00280034]) == [1, 2]
+    assert element_value(ds['Modality']) == 'US'
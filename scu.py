@@ -1,33 +1,94 @@
-import logging
+import asyncio
 import os
+import sys
 from pydicom import dcmread
-from pynetdicom import AE, evt, debug_logger, StoragePresentationContexts
-from pynetdicom.sop_class import Verification, CTImageStorage
+from pydicom.uid import ExplicitVRLittleEndian, ImplicitVRLittleEndian
+from pynetdicom import AE, debug_logger, StoragePresentationContexts
+from pynetdicom.sop_class import Verification
 debug_logger()
 dicom_file_path = "./dicom_test/102.dcm"
+# Elements larger than this (Pixel Data) are read from the file while being encoded
+DEFER_SIZE = "16 KB"
+# Offered with every file's own transfer syntax, so a peer that does not accept
+# that one (a compressed syntax, say) can still negotiate the context
+FALLBACK_TRANSFER_SYNTAXES = [ExplicitVRLittleEndian, ImplicitVRLittleEndian]
 
-if os.path.exists(dicom_file_path):
-    dataset = dcmread(dicom_file_path)
-    
-    # Check if the DICOM file is compressed and decompress if needed
-    transfer_syntax = dataset.file_meta.TransferSyntaxUID
+
+def read_dataset(path):
+    return dcmread(path, defer_size=DEFER_SIZE)
+
+
+def report(path, status):
+    # Check the status of the operation
+    if status:
+        status_code = getattr(status, "Status", None)
+        if status_code == 0x0000:
+            print(f"DICOM file sent successfully: {path}")
+        else:
+            print(f"Failed to send DICOM file {path}. Status: {hex(status_code) if status_code else 'Unknown'}")
+    else:
+        print(f"Failed to send DICOM file {path}: no response")
+
+
+def requested_contexts(paths):
+    """(SOP class, transfer syntaxes) of the files to send, or None if a file has no SOP Class UID."""
+    contexts = {}
+    for path in paths:
+        header = dcmread(path, stop_before_pixels=True, specific_tags=["SOPClassUID"])
+        sop_class = header.get("SOPClassUID")
+        if sop_class is None:
+            return None
+        transfer_syntaxes = contexts.setdefault(sop_class, [])
+        # A file without file meta only gets the fallback syntaxes
+        file_meta = getattr(header, "file_meta", None)
+        transfer_syntax = file_meta.get("TransferSyntaxUID") if file_meta is not None else None
+        if transfer_syntax is not None and transfer_syntax not in transfer_syntaxes:
+            transfer_syntaxes.append(transfer_syntax)
+    for transfer_syntaxes in contexts.values():
+        transfer_syntaxes.extend(ts for ts in FALLBACK_TRANSFER_SYNTAXES if ts not in transfer_syntaxes)
+    return contexts
+
+
+async def send_files(association, paths):
+    """Send the files over one association, reading the next file while the current one is sent.
+
+    C-STOREs on an association are sequential, so only the reads overlap the sends.
+    """
+    pending = asyncio.create_task(asyncio.to_thread(read_dataset, paths[0]))
+    for index, path in enumerate(paths):
+        dataset = await pending
+        if index + 1 < len(paths):
+            pending = asyncio.create_task(asyncio.to_thread(read_dataset, paths[index + 1]))
+        status = await asyncio.to_thread(association.send_c_store, dataset)
+        # status = association.send_c_find(dataset)
+        report(path, status)
+
+
+paths = []
+for path in sys.argv[1:] or [dicom_file_path]:
+    if os.path.exists(path):
+        paths.append(path)
+    else:
+        print(f"DICOM file not found: {path}")
+
+if paths:
     ae = AE()
-    ae.requested_contexts = StoragePresentationContexts[:127]
+    # Only request the storage contexts needed for the files being sent,
+    # a smaller A-ASSOCIATE-RQ
+    contexts = requested_contexts(paths)
+    if contexts is not None and len(contexts) < 128:
+        ae.add_requested_context(Verification)
+        for sop_class, transfer_syntaxes in contexts.items():
+            ae.add_requested_context(sop_class, transfer_syntaxes)
+    else:
+        ae.requested_contexts = StoragePresentationContexts[:127]
     association = ae.associate('127.0.0.1', 11112, ae_title="DCM4CHEE")
     if association.is_established:
         print("Association established")
-        status = association.send_c_store(dataset)
-        # status = association.send_c_find(dataset)
-        # Check the status of the operation
-        if status:
-            status_code = getattr(status, "Status", None)
-            if status_code == 0x0000:
-                print("DICOM file sent successfully")
-            else:
-                print(f"Failed to send DICOM file. Status: {hex(status_code) if status_code else 'Unknown'}")
-        association.release()
+        try:
+            asyncio.run(send_files(association, paths))
+        finally:
+            association.release()
     else:
         print("Association rejected, testing ABORT")
         association.abort()
-else:
-    print(f"DICOM file not found: {dicom_file_path}")
\ No newline at end of file